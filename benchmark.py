@@ -0,0 +1,283 @@
+# Copyright 2020-2023 Lantis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Usage:
+#   python benchmark.py parser [entries | path/to/SavedVariables.lua]
+#   python benchmark.py build [entries] [raid entries]
+#   python benchmark.py models [entries]
+
+import re
+import sys
+import time
+import random
+import operator
+import tempfile
+import tracemalloc
+
+from savedvariables_parser import SavedVariablesParser, WowLuaParser
+from bot_logger import BotLogger
+from bot_config import BotConfig
+from player_db_models import PlayerInfo, PlayerLoot, PlayerDKPHistory
+import bot_factory
+import footprint
+
+
+def _lua_value(value, depth=1):
+    indent = "\t" * depth
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    if isinstance(value, list):
+        string = "{\r\n"
+        for idx, entry in enumerate(value):
+            string += "{0}{1}, -- [{2}]\r\n".format(
+                indent, _lua_value(entry, depth + 1), idx + 1
+            )
+        return string + indent[:-1] + "}"
+    if isinstance(value, dict):
+        string = "{\r\n"
+        for key, entry in value.items():
+            string += '{0}["{1}"] = {2},\r\n'.format(
+                indent, key, _lua_value(entry, depth + 1)
+            )
+        return string + indent[:-1] + "}"
+    return "nil"
+
+
+def generate_saved_variables(entries=10000, seed=0, limit=None, ties=1):
+    """Builds EssentialDKP-like SavedVariables text with `entries` loot and
+    history entries each. With `limit` only the oldest entries are written,
+    giving an earlier upload of the same guild. Every `ties` consecutive
+    entries share a date."""
+    if limit is None:
+        limit = entries
+    rng = random.Random(seed)
+    players = ["Player{0}".format(i) for i in range(max(40, entries // 100))]
+    dkp_table = [
+        {
+            "player": player,
+            "dkp": rng.randint(0, 500) + 0.5 + limit,
+            "lifetime_gained": 900,
+            "lifetime_spent": -300,
+            "class": rng.choice(["WARRIOR", "PRIEST", "MAGE", "ROGUE"]),
+            "role": "No Role Detected",
+            "spec": "(31/5/15)",
+        }
+        for player in players
+    ]
+    loot = [
+        {
+            "player": rng.choice(players),
+            "cost": rng.randint(1, 120),
+            "loot": "|cffa335ee|Hitem:{0}::::::::60:::::::|h[Item {0}]|h|r".format(
+                rng.randint(10000, 20000)
+            ),
+            "date": 1600000000 + (idx // ties) * 60,
+            "index": "Officer-{0}".format(idx),
+        }
+        for idx in range(entries)
+    ]
+    history = [
+        {
+            "players": ",".join(rng.sample(players, 20)) + ",",
+            "dkp": rng.choice([10, 15, -5]),
+            "date": 1600000000 + (idx // ties) * 60,
+            "reason": "Boss Kill",
+            "index": "Officer-{0}".format(idx),
+        }
+        for idx in range(entries)
+    ]
+    return (
+        "MonDKP_DB = " + _lua_value({"modes": {"rounding": 1}}) + "\r\n"
+        "MonDKP_DKPTable = " + _lua_value(dkp_table) + "\r\n"
+        "MonDKP_Loot = " + _lua_value(loot[:limit]) + "\r\n"
+        "MonDKP_DKPHistory = " + _lua_value(history[:limit]) + "\r\n"
+    )
+
+
+def _slpp_parse_string(input_string):
+    # Reference: the original SLPP character walker path
+    wlp = WowLuaParser()
+    pattern = re.compile("^\s*([a-zA-Z0-9-_]*)\s*=\s*")  # pylint: disable=anomalous-backslash-in-string
+    saved_variables = {}
+    for string in input_string.split("}\r\n"):
+        if len(string) == 0:
+            continue
+        string += "}"
+        out = pattern.match(string)
+        saved_variables[out.group().replace(" = ", "").strip()] = wlp.decode(
+            pattern.sub("", string, 1)
+        )
+    return saved_variables
+
+
+def _measure(callback, *args):
+    start = time.perf_counter()
+    result = callback(*args)
+    return (result, time.perf_counter() - start)
+
+
+def benchmark_parser(argument="10000"):
+    if argument.isdigit():
+        text = generate_saved_variables(int(argument))
+        source = "generated ({0} entries)".format(argument)
+    else:
+        with open(argument, encoding="utf-8", errors="replace", newline="") as file:
+            text = file.read()
+        source = argument
+
+    megabytes = len(text.encode("utf-8")) / (1024 * 1024)
+    print("Input: {0} {1:.2f} MB".format(source, megabytes))
+
+    reference, reference_time = _measure(_slpp_parse_string, text)
+    print(
+        "SLPP:    {0:7.3f} s {1:7.2f} MB/s".format(
+            reference_time, megabytes / reference_time
+        )
+    )
+
+    for engine in SavedVariablesParser.ENGINES:
+        result, result_time = _measure(
+            SavedVariablesParser(engine).parse_string, text
+        )
+        print(
+            "{0:8} {1:7.3f} s {2:7.2f} MB/s x{3:.1f} matches SLPP: {4}".format(
+                engine.capitalize() + ":",
+                result_time,
+                megabytes / result_time,
+                reference_time / result_time,
+                result == reference,
+            )
+        )
+
+
+def _new_bot():
+    config = BotConfig()
+    config.guild_info.bot_type = "essential"
+    return bot_factory.new(0, config)
+
+
+def _database_summary(bot):
+    database = bot.database_get()
+    latest = [
+        (dkp.get_latest_loot_entry(), dkp.get_latest_history_entry(), dkp.is_active())
+        for team_data in database["global"].values()
+        for dkp in team_data["dkp"].values()
+    ]
+    return repr((database["global"], database["group"], latest))
+
+
+def benchmark_build(entries="10000", raid="200"):
+    entries = int(entries)
+    total = entries + int(raid)
+    BotLogger().initialize(tempfile.mkdtemp())
+    info = {"comment": "", "date": "", "author": ""}
+    previous = generate_saved_variables(total, limit=entries)
+    text = generate_saved_variables(total)
+    print("Input: generated ({0} entries + {1} raid entries)".format(entries, raid))
+
+    full_bot = _new_bot()
+    _, full_time = _measure(full_bot.build_database, text, info)
+    print(
+        "Full:     {0:7.3f} s {1:7.1f} MB".format(
+            full_time, footprint.total_size(full_bot.database_get()) / (1024 * 1024)
+        )
+    )
+
+    delta_bot = _new_bot()
+    delta_bot.build_database(previous, info)
+    _, delta_time = _measure(delta_bot.build_database, text, info)
+    print(
+        "Extended: {0:7.3f} s x{1:.1f} matches full: {2}".format(
+            delta_time,
+            full_time / delta_time,
+            _database_summary(delta_bot) == _database_summary(full_bot),
+        )
+    )
+
+    # Same dates across the upload boundary, new entries follow the old ones
+    ties = 3
+    limit = entries - entries % ties + 1
+    previous = generate_saved_variables(total, limit=limit, ties=ties)
+    text = generate_saved_variables(total, ties=ties)
+    full_bot = _new_bot()
+    full_bot.build_database(text, info)
+    delta_bot = _new_bot()
+    delta_bot.build_database(previous, info)
+    _, delta_time = _measure(delta_bot.build_database, text, info)
+    print(
+        "Ties:     {0:7.3f} s matches full: {1}".format(
+            delta_time,
+            _database_summary(delta_bot) == _database_summary(full_bot),
+        )
+    )
+
+
+def _measure_memory(callback, *args):
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = callback(*args)
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return (result, size)
+
+
+def _generate_history(player, entries):
+    return [
+        PlayerDKPHistory(player, 10, 1600000000 + idx, "Boss Kill", "Officer-{0}".format(idx))
+        for idx in range(entries)
+    ]
+
+
+def _generate_loot(player, entries):
+    return [
+        PlayerLoot(player, 19019, "Thunderfury", 100, 1600000000 + idx)
+        for idx in range(entries)
+    ]
+
+
+def benchmark_models(entries="100000"):
+    entries = int(entries)
+    player = PlayerInfo("Player", 100, 900, 300, "WARRIOR", "", "(31/5/15)")
+    print("Entries: {0}".format(entries))
+
+    for name, generate in [("History", _generate_history), ("Loot", _generate_loot)]:
+        database, size = _measure_memory(generate, player, entries)
+        print("{0:8} {1:7.1f} B/entry".format(name + ":", size / entries))
+        for accessor in ["dkp", "timestamp", "player"]:
+            call = operator.methodcaller(accessor)
+            accessor_time = min(
+                _measure(lambda: list(map(call, database)))[1] for _ in range(3)
+            )
+            print(
+                "  {0:12} {1:7.1f} ns/call".format(
+                    accessor + "()", accessor_time * 1e9 / entries
+                )
+            )
+
+
+BENCHMARKS = {
+    "parser": benchmark_parser,
+    "build": benchmark_build,
+    "models": benchmark_models,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in BENCHMARKS:
+        print("Usage: {0} [{1}] [args]".format(sys.argv[0], "|".join(BENCHMARKS)))
+        sys.exit(1)
+    BENCHMARKS[sys.argv[1]](*sys.argv[2:])
@@ -13,7 +13,11 @@
 # limitations under the License.
 
 import sys
+import random
+import reprlib
 import logging
+import logging.handlers
+import contextvars
 import inspect, functools
 
 
@@ -21,6 +25,8 @@ class BotLogger:
     class __BotLogger:  # pylint: disable=invalid-name, attribute-defined-outside-init
         stdout_enabled = False
         trace_enabled = False
+        trace_guilds = None  # None traces all
+        trace_sampling = 1.0
 
         def initialize(self, path):
             self.stdout_enabled = False
@@ -44,6 +50,29 @@ class BotLogger:
 
             self.set_level(self.level)
 
+        # Worker processes forward records to the process owning bot.log
+        def initialize_queue(self, queue, level):
+            self.stdout_enabled = False
+            self.trace_enabled = False
+            self.level = level
+
+            self.logger = logging.getLogger("wowdkpbot-worker")
+            self.queue_handler = logging.handlers.QueueHandler(queue)
+            self.logger.addHandler(self.queue_handler)
+            self.formatter = logging.Formatter(
+                "[%(asctime)s %(levelname)8s] %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            )
+            self.stdout_handler = logging.StreamHandler(sys.stdout)
+            self.stdout_handler.setFormatter(self.formatter)
+
+            self.set_level(self.level)
+
+        # Writes records sent by initialize_queue loggers through this logger
+        def listen(self, queue):
+            listener = logging.handlers.QueueListener(queue, self.logger)
+            listener.start()
+            return listener
+
         def get(self):
             return self.logger
 
@@ -59,10 +88,32 @@ class BotLogger:
             if self.trace_enabled != enable:
                 if enable:
                     self.logger.setLevel(logging.DEBUG)
+                    _install_tracing()
                 else:
+                    _remove_tracing()
                     self.__set_level_internal()
                 self.trace_enabled = enable
 
+        def config_trace_guilds(self, guilds):
+            if guilds is None:
+                self.trace_guilds = None
+            else:
+                self.trace_guilds = set(map(int, guilds))
+
+        def config_trace_sampling(self, rate):
+            rate = float(rate)
+            if rate <= 0 or rate > 1:
+                self.logger.warning("Invalid trace sampling rate {0}".format(rate))
+                return False
+            self.trace_sampling = rate
+            return True
+
+        # Decided once per scope: a sampled request is traced whole
+        def is_trace_selected(self, guild_id):
+            if self.trace_guilds is not None and guild_id not in self.trace_guilds:
+                return False
+            return self.trace_sampling >= 1 or random.random() < self.trace_sampling
+
         def __set_level_internal(self):
             self.logger.warning("Setting log level %s", self.get_level_name())
             self.logger.setLevel(self.level)
@@ -110,8 +161,46 @@ class BotLogger:
         return setattr(self.instance, name, value)
 
 
-def _sat(input, width=1024):
-    return str(input)[:width]
+# Calls on objects with a trace_scope (bots use their guild id), and all
+# calls made from them, are traced only if the scope is selected.
+_trace_scope = contextvars.ContextVar("trace_scope", default=None)
+
+_trace_repr = reprlib.Repr()
+_trace_repr.maxlevel = 2
+_trace_repr.maxstring = 64
+_trace_repr.maxother = 64
+_trace_repr.maxlist = 5
+_trace_repr.maxtuple = 5
+_trace_repr.maxset = 5
+_trace_repr.maxdict = 5
+
+
+# Formatted only when the record is emitted and never beyond reprlib limits
+class _TraceRepr:
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return _trace_repr.repr(self.value)
+
+
+def _enter_trace_scope(args):
+    scope = getattr(args[0], "trace_scope", None) if len(args) > 0 else None
+    if scope is None:
+        return None
+    current = _trace_scope.get()
+    if current is not None and current[0] == scope:
+        return None
+    return _trace_scope.set((scope, BotLogger().is_trace_selected(scope)))
+
+
+def _is_traced():
+    current = _trace_scope.get()
+    if current is None:
+        return BotLogger().is_trace_selected(None)
+    return current[1]
 
 
 # https://stackoverflow.com/questions/3589311/get-defining-class-of-unbound-method-object-in-python-3/25959545#25959545
@@ -138,40 +227,120 @@ def _get_class_that_defined_method(meth):
     return getattr(meth, "__objclass__", None)  # handle special descriptor objects
 
 
-def trace(func):
+def _tracer(func):
     def tracer(*args, **kwargs):
-        if BotLogger().is_trace_enabled():
-            BotLogger().get().debug(
-                "%s : %s : %s", _sat(func.__name__), _sat(args), _sat(kwargs)
-            )
-        return func(*args, **kwargs)
+        token = _enter_trace_scope(args)
+        try:
+            if _is_traced():
+                BotLogger().get().debug(
+                    "%s : %s : %s", func.__name__, _TraceRepr(args), _TraceRepr(kwargs)
+                )
+            return func(*args, **kwargs)
+        finally:
+            if token is not None:
+                _trace_scope.reset(token)
 
     return tracer
 
 
-def trace_func_only(func):
+def _func_only_tracer(func):
     def tracer(*args, **kwargs):
-        if BotLogger().is_trace_enabled():
-            class_name = _get_class_that_defined_method(func)
-            BotLogger().get().debug(
-                "%s%s",
-                _sat(func.__name__),
-                (" " + str(class_name)) if class_name is not None else "",
-            )
-        return func(*args, **kwargs)
+        token = _enter_trace_scope(args)
+        try:
+            if _is_traced():
+                class_name = _get_class_that_defined_method(func)
+                BotLogger().get().debug(
+                    "%s%s",
+                    func.__name__,
+                    (" " + str(class_name)) if class_name is not None else "",
+                )
+            return func(*args, **kwargs)
+        finally:
+            if token is not None:
+                _trace_scope.reset(token)
 
     return tracer
 
 
+# Tracing is instrumentation installed only while trace is enabled. The
+# decorators just register what to wrap, so disabled trace costs nothing.
+_traced_methods = []  # (class, attribute, tracer)
+_traced_functions = []  # (function, tracer)
+_installed_tracers = []  # (owner, attribute, original)
+
+
+def _wrap(original, tracer):
+    if isinstance(original, (staticmethod, classmethod)):
+        return type(original)(tracer(original.__func__))
+    return tracer(original)
+
+
+def _install_method_tracer(cls, attr, tracer):
+    original = cls.__dict__[attr]
+    _installed_tracers.append((cls, attr, original))
+    setattr(cls, attr, _wrap(original, tracer))
+
+
+def _install_function_tracers(functions):
+    # Also replaces copies made by `from module import function`
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if not isinstance(namespace, dict):
+            continue
+        for name, value in list(namespace.items()):
+            function = functions.get(id(value))
+            if function is not None and function[0] is value:
+                _installed_tracers.append((module, name, value))
+                setattr(module, name, function[1](value))
+
+
+def _install_tracing():
+    for (cls, attr, tracer) in _traced_methods:
+        _install_method_tracer(cls, attr, tracer)
+    _install_function_tracers(
+        {id(function): (function, tracer) for (function, tracer) in _traced_functions}
+    )
+
+
+def _remove_tracing():
+    while len(_installed_tracers) > 0:
+        (owner, attr, original) = _installed_tracers.pop()
+        setattr(owner, attr, original)
+
+
+def trace(func):
+    _traced_functions.append((func, _tracer))
+    if BotLogger().is_trace_enabled():
+        _install_function_tracers({id(func): (func, _tracer)})
+    return func
+
+
+def trace_func_only(func):
+    _traced_functions.append((func, _func_only_tracer))
+    if BotLogger().is_trace_enabled():
+        _install_function_tracers({id(func): (func, _func_only_tracer)})
+    return func
+
+
+__tracers = {trace: _tracer, trace_func_only: _func_only_tracer}
+
+
 # https://stackoverflow.com/questions/6307761/how-to-decorate-all-functions-of-a-class-without-typing-it-over-and-over-for-eac
 def for_all_methods(decorator=trace, decorator_internal_methods=trace_func_only):
     def decorate(cls):
-        for attr in cls.__dict__:
-            if callable(getattr(cls, attr)):
-                if attr in ["__init__", "__str__", "__repr__", "__hash__"]:
-                    setattr(cls, attr, decorator_internal_methods(getattr(cls, attr)))
-                else:
-                    setattr(cls, attr, decorator(getattr(cls, attr)))
+        for attr, value in list(cls.__dict__.items()):
+            if not (
+                inspect.isfunction(value)
+                or isinstance(value, (staticmethod, classmethod))
+            ):
+                continue
+            if attr in ["__init__", "__str__", "__repr__", "__hash__"]:
+                tracer = __tracers[decorator_internal_methods]
+            else:
+                tracer = __tracers[decorator]
+            _traced_methods.append((cls, attr, tracer))
+            if BotLogger().is_trace_enabled():
+                _install_method_tracer(cls, attr, tracer)
         return cls
 
     return decorate
\ No newline at end of file
@@ -0,0 +1,152 @@
+# Copyright 2020-2023 Lantis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import pickle
+import hashlib
+import threading
+import collections
+from bot_logger import BotLogger
+
+
+class BuildCache(object):
+    class __BuildCache:  # pylint: disable=invalid-name, attribute-defined-outside-init
+        EXTENSION = ".bin"
+
+        def __init__(self):
+            self.__directory = None
+            self.__limit = 0
+            self.__size = 0
+            self.__hits = 0
+            self.__misses = 0
+            # Least recently used first
+            self.__entries = collections.OrderedDict()
+            self.__lock = threading.Lock()
+
+        def initialize(self, directory, limit):
+            # Size limit in bytes, 0 disables the cache
+            self.__limit = int(limit)
+            self.__directory = directory
+            self.__entries.clear()
+            self.__size = 0
+            if not self.is_enabled():
+                return
+
+            os.makedirs(directory, exist_ok=True)
+            files = []
+            for filename in os.listdir(directory):
+                if not filename.endswith(self.EXTENSION):
+                    continue
+                stat = os.stat(self.__path(filename[: -len(self.EXTENSION)]))
+                files.append((stat.st_mtime, filename, stat.st_size))
+            # Recency survives restarts through file modification time
+            for (_, filename, size) in sorted(files):
+                self.__entries[filename[: -len(self.EXTENSION)]] = size
+                self.__size += size
+            self.__evict()
+            BotLogger().get().info(
+                "Build cache: %d entries, %d B", len(self.__entries), self.__size
+            )
+
+        def is_enabled(self):
+            return self.__limit > 0 and self.__directory is not None
+
+        def stats(self):
+            return {
+                "entries": len(self.__entries),
+                "size": self.__size,
+                "hits": self.__hits,
+                "misses": self.__misses,
+            }
+
+        @staticmethod
+        def key(data: bytes, signature: str):
+            digest = hashlib.sha256(data)
+            digest.update(signature.encode("utf-8"))
+            return digest.hexdigest()
+
+        def get(self, key):
+            if not self.is_enabled():
+                return None
+
+            with self.__lock:
+                if key not in self.__entries:
+                    self.__misses += 1
+                    return None
+                self.__entries.move_to_end(key)
+                self.__hits += 1
+
+            try:
+                with open(self.__path(key), "rb") as file_pointer:
+                    database = pickle.load(file_pointer)
+                os.utime(self.__path(key))
+                return database
+            except (OSError, pickle.UnpicklingError, EOFError) as exception:
+                BotLogger().get().warning("Build cache entry %s lost: %s", key, exception)
+                with self.__lock:
+                    self.__remove(key)
+                return None
+
+        def put(self, key, database):
+            if not self.is_enabled():
+                return
+
+            path = self.__path(key)
+            temporary = "{0}.{1}.tmp".format(path, threading.get_ident())
+            try:
+                with open(temporary, "wb") as file_pointer:
+                    pickle.dump(database, file_pointer, pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, path)
+                size = os.path.getsize(path)
+            except (OSError, pickle.PicklingError) as exception:
+                BotLogger().get().warning("Build cache store failed: %s", exception)
+                if os.path.exists(temporary):
+                    os.remove(temporary)
+                return
+
+            with self.__lock:
+                self.__size -= self.__entries.pop(key, 0)
+                self.__entries[key] = size
+                self.__size += size
+                self.__evict()
+
+        def __path(self, key):
+            return "{0}/{1}{2}".format(self.__directory, key, self.EXTENSION)
+
+        # Must be called with lock held (or before the cache is shared)
+        def __remove(self, key):
+            self.__size -= self.__entries.pop(key, 0)
+            try:
+                os.remove(self.__path(key))
+            except OSError:
+                pass
+
+        def __evict(self):
+            while self.__size > self.__limit and len(self.__entries) > 0:
+                key = next(iter(self.__entries))
+                BotLogger().get().debug("Build cache evicting %s", key)
+                self.__remove(key)
+
+    instance = None
+
+    def __new__(cls):  # __new__ always a classmethod
+        if not BuildCache.instance:
+            BuildCache.instance = BuildCache.__BuildCache()
+        return BuildCache.instance
+
+    def __getattr__(self, name):
+        return getattr(self.instance, name)
+
+    def __setattr__(self, name, value):
+        return setattr(self.instance, name, value)
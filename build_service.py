@@ -0,0 +1,130 @@
+# Copyright 2020-2023 Lantis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import multiprocessing
+import concurrent.futures
+import build_worker
+from bot_logger import BotLogger
+from build_cache import BuildCache
+
+
+class BuildService(object):
+    class __BuildService:  # pylint: disable=invalid-name, attribute-defined-outside-init
+        def __init__(self):
+            self.__pool = None
+            self.__log_listener = None
+            self.__semaphore = None
+            self.__concurrent = 1
+
+        def initialize(self, workers, limit, parser_engine):
+            # With 0 workers databases are built in threads of this process.
+            # Limit bounds builds in flight, queued ones included.
+            workers = int(workers)
+            self.__concurrent = max(1, int(limit))
+            if workers > 0:
+                # Spawn, not fork, as workers start while the gateway is running.
+                # Spawned workers re-import the entry module, see main.py
+                context = multiprocessing.get_context("spawn")
+                log_queue = context.Queue()
+                self.__log_listener = BotLogger().listen(log_queue)
+                self.__pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=context,
+                    initializer=build_worker.initialize,
+                    initargs=(log_queue, BotLogger().get_level(), parser_engine),
+                )
+            BotLogger().get().info(
+                "Build service: %d workers, %d concurrent builds",
+                workers,
+                self.__concurrent,
+            )
+
+        def shutdown(self):
+            if self.__pool is not None:
+                self.__pool.shutdown(wait=False, cancel_futures=True)
+                self.__pool = None
+            if self.__log_listener is not None:
+                self.__log_listener.stop()
+                self.__log_listener = None
+
+        async def build(self, bot, input_bytes: bytes, info):
+            loop = asyncio.get_running_loop()
+            if self.__semaphore is None:
+                self.__semaphore = asyncio.Semaphore(self.__concurrent)
+
+            async with self.__semaphore:
+                cache_key = await loop.run_in_executor(
+                    None, bot.get_build_cache_key, input_bytes
+                )
+                response = await loop.run_in_executor(
+                    None, bot.restore_database, cache_key, info
+                )
+                if response is not None:
+                    return response
+
+                if self.__pool is None:
+                    return await loop.run_in_executor(
+                        None, bot.build_database, build_worker.decode(input_bytes), info, cache_key
+                    )
+
+                # Uploads extending the loaded database are only parsed in
+                # the pool, new entries are applied here
+                state = bot.get_delta_state()
+                (guild_id, config) = bot.get_build_arguments()
+                (response, database, delta, profile) = await loop.run_in_executor(
+                    self.__pool,
+                    build_worker.build_database,
+                    guild_id,
+                    config,
+                    input_bytes,
+                    info,
+                    state,
+                )
+                bot.record_build_profile(profile)
+                if delta is not None:
+                    response = await loop.run_in_executor(
+                        None, bot.extend_database, delta, state, info, cache_key
+                    )
+                    if response is not None:
+                        return response
+                    (response, database, _, profile) = await loop.run_in_executor(
+                        self.__pool,
+                        build_worker.build_database,
+                        guild_id,
+                        config,
+                        input_bytes,
+                        info,
+                        None,
+                    )
+                    bot.record_build_profile(profile)
+                if database is not None:
+                    bot.install_database(database, info)
+                    await loop.run_in_executor(
+                        None, BuildCache().put, cache_key, database
+                    )
+                return response
+
+    instance = None
+
+    def __new__(cls):  # __new__ always a classmethod
+        if not BuildService.instance:
+            BuildService.instance = BuildService.__BuildService()
+        return BuildService.instance
+
+    def __getattr__(self, name):
+        return getattr(self.instance, name)
+
+    def __setattr__(self, name, value):
+        return setattr(self.instance, name, value)
@@ -0,0 +1,38 @@
+# Copyright 2020-2023 Lantis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Build worker process side. Imports only what parsing and building need,
+# the Discord client stays in the main process.
+
+import bot_factory
+from bot_logger import BotLogger
+from savedvariables_parser import SavedVariablesParser
+
+
+def decode(input_bytes: bytes):
+    return input_bytes.decode("utf-8", errors="replace")
+
+
+def initialize(log_queue, log_level, parser_engine):
+    BotLogger().initialize_queue(log_queue, log_level)
+    SavedVariablesParser.set_default_engine(parser_engine)
+
+
+def build_database(guild_id, config, input_bytes, info, state):
+    bot = bot_factory.new(guild_id, config)
+    (response, delta) = bot.build_or_get_delta(decode(input_bytes), info, state)
+    profile = bot.get_build_profile()
+    if not bot.is_database_loaded():
+        return (response, None, delta, profile)
+    return (response, bot.database_get(), None, profile)
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import re
+import operator
 from enum import Enum
 from dkp_bot import DKPBot, Response, ResponseStatus
 from essentialdkp_bot import EssentialDKPBot
@@ -42,6 +43,9 @@ from display_templates_epgp import (
 )
 from bot_logger import BotLogger, trace, trace_func_only, for_all_methods
 
+# PR kept in the lifetime spent slot, ties ordered by EP
+_pr_key = operator.attrgetter("_lifetime_spent", "_dkp")
+
 
 @for_all_methods(trace, trace_func_only)
 class CEPGPBot(EssentialDKPBot):
@@ -141,6 +145,13 @@ class CEPGPBot(EssentialDKPBot):
 
     ### Database - Variables parsing ###
 
+    # Standings are displayed by PR
+    def _get_standings_order(self):
+        return (_pr_key, True)
+
+    def _get_saved_variables_names(self):
+        return [self._SV]
+
     def _generate_player_info(self, player_entry, data):
         if not player_entry or not data:
             return None
@@ -496,7 +507,7 @@ class CEPGPBot(EssentialDKPBot):
 
         output_result_list = []
         if "all" in original:
-            output_result_list = self._get_team_dkp(self.DEFAULT_TEAM)
+            output_result_list = self._get_team_standings(self.DEFAULT_TEAM)
         else:
             if raid_helper_filter:
                 targets = signed
@@ -516,7 +527,9 @@ class CEPGPBot(EssentialDKPBot):
         if len(output_result_list) == 1:
             data = self._build_dkp_output_single(output_result_list[0])
         elif len(output_result_list) > 0:
-            output_result_list.sort(key=lambda info: info.ep(), reverse=True)
+            output_result_list = self._order_by_standings(
+                output_result_list, self.DEFAULT_TEAM
+            )
             data = self._build_dkp_output_multiple(
                 output_result_list, request_info["author"]["name"]
             )
@@ -39,6 +39,9 @@ class CLMBot(EssentialDKPBot):
     def _get_addon_thumbnail(self):
         return "https://cdn.discordapp.com/attachments/843129642298376252/892049790731436082/CLM-dark-v4.png"
 
+    def _get_saved_variables_names(self):
+        return [self._SV]
+
     def __get_data(self, data_dict):
         server_side = self._get_config().guild_info.server_side
         guild_name = self._get_config().guild_info.guild_name
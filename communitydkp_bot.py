@@ -85,6 +85,9 @@ class CommunityDKPBot(EssentialDKPBot):
 
         return guilds.get(guild_name_key)
 
+    def _get_team_entries(self, saved_variable, name):
+        return self.__get_configured_teams(saved_variable.get(name))
+
     # Called 1st
     def _build_config_database(self, saved_variable):  # pylint: disable=unused-argument
         super()._build_loot_database(None)
@@ -17,7 +17,6 @@ import io
 import atexit
 import pickle
 import asyncio
-import concurrent.futures
 import pytz
 from typing import List
 from enum import Enum
@@ -35,6 +34,9 @@ from bot_logger import BotLogger, trace
 from display_templates import BasicSuccess, BasicError, BasicInfo, BasicCritical, SimpleDeny
 from loop_activity import LoopActivity
 from bot_utility import SPLIT_DELIMITERS
+from savedvariables_parser import SavedVariablesParser
+from build_cache import BuildCache
+from build_service import BuildService
 import footprint
 import superuser
 import raidhelper
@@ -95,9 +97,19 @@ def get_config(filepath):
     config_dir = config.get(section, "config")
     storage_dir = config.get(section, "storage")
     log_dir = config.get(section, "log")
+    cache_dir = config.get(section, "cache", fallback=storage_dir + "/cache")
     section = "Raid-Helper"
     raidhelper_api_endpoint = config.get(section, "endpoint")
     raidhelper_api_token = config.get(section, "token")
+    section = "Cache"
+    cache_limit = config.getint(section, "size-mb", fallback=512) * 1024 * 1024
+    section = "Build"
+    build_workers = config.getint(section, "workers", fallback=2)
+    build_limit = config.getint(section, "concurrent", fallback=2)
+    section = "Parser"
+    parser_engine = config.get(
+        section, "engine", fallback=SavedVariablesParser.ENGINE_SCANNER
+    )
 
     return (
         token,
@@ -108,6 +120,11 @@ def get_config(filepath):
         su_id,
         raidhelper_api_endpoint,
         raidhelper_api_token,
+        parser_engine,
+        cache_dir,
+        cache_limit,
+        build_workers,
+        build_limit,
     )
 
 
@@ -116,8 +133,26 @@ def cleanup():
     for bot in bots.values():
         if isinstance(bot, dkp_bot.DKPBot):
             bot.shutdown()
+    BuildService().shutdown()
     BotLogger().get().info("Bye Bye!")
 
+# Spawned build workers re-import the __main__ module. Point it at the side
+# effect free main.py so they do not set up the Discord client again.
+def set_spawn_entry():
+    import main as entry
+
+    sys.modules.setdefault("core", sys.modules[__name__])
+    sys.modules["__main__"] = entry
+
+
+# Entry for both core.py and main.py
+def run(argv):
+    if len(argv) != 2:
+        sys.exit(1)
+    set_spawn_entry()
+    main(script_control)
+
+
 # Main
 def main(control: ScriptControl):
     # Get Config
@@ -130,6 +165,11 @@ def main(control: ScriptControl):
         su_id,
         raidhelper_api_endpoint,
         raidhelper_api_token,
+        parser_engine,
+        cache_dir,
+        cache_limit,
+        build_workers,
+        build_limit,
     ) = get_config(sys.argv[1])
     control.initialize(token, config_dir, storage_dir, in_memory_objects_limit)
     # Initialize Logs
@@ -142,6 +182,12 @@ def main(control: ScriptControl):
     )
     # Initialize Raid Helper Integration
     raidhelper.RaidHelper().initialize(raidhelper_api_endpoint, raidhelper_api_token)
+    # Select SavedVariables parsing engine
+    SavedVariablesParser.set_default_engine(parser_engine)
+    # Initialize build cache
+    BuildCache().initialize(cache_dir, cache_limit)
+    # Initialize build workers
+    BuildService().initialize(build_workers, build_limit, parser_engine)
     # Register atexit script
     atexit.register(cleanup)
     # Create inifite task
@@ -420,17 +466,16 @@ async def discord_attachment_check(bot: dkp_bot.DKPBot, message: disnake.Message
                     message.guild.name,
                     message.guild.id,
                 )
-                with concurrent.futures.ThreadPoolExecutor() as pool:
-                    response = await discord_bot.loop.run_in_executor(pool, bot.build_database, attachment_bytes.decode("utf-8", errors="replace"), info)
-                    if response.status == dkp_bot.ResponseStatus.SUCCESS:
-                        if (
-                            announce and bot.is_announcement_channel_registered()
-                        ):  # announce
-                            await discord_announce(bot, message.guild.channels)
-                        await discord_respond(message.channel, response.data)
-                    elif response.status == dkp_bot.ResponseStatus.ERROR:
-                        await discord_respond(message.channel, response.data)
-                    return response.status
+                response = await BuildService().build(bot, attachment_bytes, info)
+                if response.status == dkp_bot.ResponseStatus.SUCCESS:
+                    if (
+                        announce and bot.is_announcement_channel_registered()
+                    ):  # announce
+                        await discord_announce(bot, message.guild.channels)
+                    await discord_respond(message.channel, response.data)
+                elif response.status == dkp_bot.ResponseStatus.ERROR:
+                    await discord_respond(message.channel, response.data)
+                return response.status
             else:
                 BotLogger().get().debug(
                     "Ignoring file [%s] with size [%d B] on channel [%s (%d)] in [%s (%d)]",
@@ -802,6 +847,15 @@ def preprocess_command(request, params, private, prefix):
     ## Build the old API command
     return prefix + request + separator + params
 
+@trace
+def paged_params(interaction, target, paging):
+    if paging is None or paging <= 0:
+        return target
+    ## Page number needs explicit target
+    if not target:
+        target = normalize_author(interaction.author)
+    return "{0} {1}".format(target, paging)
+
 @trace
 async def handle_bot_interaction(interaction, params, request, channels=[], roles=[], private_response=False):
     defered = False
@@ -903,18 +957,18 @@ async def rc(interaction: disnake.ApplicationCommandInteraction,
 @discord_bot.slash_command(description="Request player or point history.")
 async def history(interaction: disnake.ApplicationCommandInteraction,
         target: str=commands.Param(description="Player name.", default=None),
-        paging: int=commands.Param(description="Older data offset.", default=0),
+        paging: int=commands.Param(description="Page number, one message per page. First page is 0.", default=0),
         private: bool=commands.Param(description="Hide the call and response from other users.", default=False),
     ):
-    await handle_bot_interaction(interaction, target, 'history', private_response=private)
+    await handle_bot_interaction(interaction, paged_params(interaction, target, paging), 'history', private_response=private)
 
 @discord_bot.slash_command(description="Request player or loot history.")
 async def loot(interaction: disnake.ApplicationCommandInteraction,
         target: str=commands.Param(description="Player name.", default=None),
-        paging: int=commands.Param(description="Older data offset.", default=0),
+        paging: int=commands.Param(description="Page number, one message per page. First page is 0.", default=0),
         private: bool=commands.Param(description="Hide the call and response from other users.", default=False),
     ):
-    await handle_bot_interaction(interaction, target, 'loot', private_response=private)
+    await handle_bot_interaction(interaction, paged_params(interaction, target, paging), 'loot', private_response=private)
 
 @discord_bot.slash_command(description="Request recent raid loot. Supporter only command.")
 async def raidloot(interaction: disnake.ApplicationCommandInteraction,
@@ -1126,6 +1180,4 @@ for opt in bot_config_opts.keys():
 ####################
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        sys.exit(1)
-    main(script_control)
+    run(sys.argv)
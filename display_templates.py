@@ -722,6 +722,8 @@ class MultipleResponse(BaseResponse):
     def _display_filter(self, data):  # pylint: disable=unused-argument
         return True
 
+    # Renders data_list_unfiltered by walking the index range of the rendered
+    # rows. Only filtering goes over the whole list
     def build(self, data_list_unfiltered, requester="", thumbnail=None):
         self._embed.clear()
 
@@ -733,81 +735,164 @@ class MultipleResponse(BaseResponse):
             BotLogger().get().debug("Empty data_list_unfiltered")
             return None
 
-        if self._enable_filtering:
-            BotLogger().get().debug("Filtering enabled")
-            data_list = []
-            for data in data_list_unfiltered:
-                if self._display_filter(data):
-                    data_list.append(data)
-        else:
-            BotLogger().get().debug("Filtering disabled")
-            data_list = data_list_unfiltered.copy()
+        data_list = self.__get_display_list(data_list_unfiltered)
 
         requester = requester.strip().capitalize()
 
         num_entries = len(data_list)
 
-        # Cover very outdated database
-        if num_entries == 0:
-            data_list = data_list_unfiltered
-            num_entries = len(data_list_unfiltered)
-
-        response_count = (
-            int(num_entries / (self.__field_limit * self.__entry_limit)) + 1
-        )
+        page_size = self.__get_page_size()
+        response_count = int(num_entries / page_size) + 1
 
         if self.__response_limit > 0:
             response_count = min(response_count, self.__response_limit)
 
         self.__response_list = []
 
+        position = 0
+        end = min(num_entries, response_count * page_size)
+
         # Hook to prepare format strings if needed
+        data_list = data_list[:end]
         self._prepare(data_list)
 
         start_value = 1
         for response_id in range(response_count):
-            if len(data_list) == 0:
+            if position >= end:
                 break
-            self._embed.clear()
 
             append_id = ""
             if response_count > 1:
                 append_id = " {0}/{1}".format(response_id + 1, response_count)
 
-            self._embed.build(
-                author_name=self._title + append_id,
-                title=None,
-                description=None,
-                thumbnail_url=thumbnail,
-                color=get_class_color(),
-                footer_text=self._get_footer(),
+            position = self.__build_response(
+                data_list,
+                position,
+                end,
+                response_id,
+                append_id,
+                start_value,
+                num_entries,
+                requester,
+                thumbnail,
             )
+            start_value += page_size
 
-            # Hook to allow template overrides
-            self._override_response_loop(response_id)
+        return self
 
-            for field_id in range(self.__field_limit):
-                if len(data_list) == 0:
-                    break
+    def __get_page_size(self):
+        return self.__field_limit * self.__entry_limit
 
-                name = "{0} - {1}".format(
-                    start_value, min(start_value + self.__entry_limit - 1, num_entries)
-                )
-                value = ""
+    def __get_display_list(self, data_list_unfiltered):
+        if self._enable_filtering:
+            BotLogger().get().debug("Filtering enabled")
+            data_list = [
+                data for data in data_list_unfiltered if self._display_filter(data)
+            ]
+        else:
+            BotLogger().get().debug("Filtering disabled")
+            data_list = data_list_unfiltered
+
+        # Cover very outdated database
+        if len(data_list) == 0:
+            data_list = data_list_unfiltered
+
+        return data_list
+
+    # Renders a single response holding 0-based page out of the whole list.
+    # Only rows of that page are prepared
+    def build_page(self, data_list_unfiltered, page, requester="", thumbnail=None):
+        self._embed.clear()
+        self.__response_list = []
+
+        if not requester or not isinstance(requester, str):
+            BotLogger().get().debug("Empty requester")
+            requester = ""
+
+        if not isinstance(data_list_unfiltered, list):
+            BotLogger().get().debug("Empty data_list_unfiltered")
+            return None
+
+        data_list = self.__get_display_list(data_list_unfiltered)
+
+        requester = requester.strip().capitalize()
+
+        num_entries = len(data_list)
 
-                for _ in range(self.__entry_limit):
-                    if len(data_list) == 0:
-                        break
-                    value += self._build_row(data_list.pop(0), requester)
+        page_size = self.__get_page_size()
+        page_count = int((num_entries + page_size - 1) / page_size)
+        page = int(page)
+        if page < 0 or page >= page_count:
+            BotLogger().get().debug("Page %d out of %d pages", page, page_count)
+            return self
 
-                self._embed.add_field(name, value, self.__multiple_columns)
-                self._override_field_loop(response_id, field_id)
-                start_value += self.__entry_limit
+        start = page * page_size
+        end = min(num_entries, start + page_size)
 
-            self.__response_list.append(self._embed.get())
+        # Hook to prepare format strings if needed
+        rows = data_list[start:end]
+        self._prepare(rows)
+
+        append_id = ""
+        if page_count > 1:
+            append_id = " {0}/{1}".format(page + 1, page_count)
+
+        self.__build_response(
+            rows, 0, len(rows), 0, append_id, start + 1, num_entries, requester, thumbnail
+        )
 
         return self
 
+    # Fills single embed with rows from position up to end, returns position
+    # of the first row left out
+    def __build_response(
+        self,
+        data_list,
+        position,
+        end,
+        response_id,
+        append_id,
+        start_value,
+        num_entries,
+        requester,
+        thumbnail,
+    ):
+        self._embed.clear()
+
+        self._embed.build(
+            author_name=self._title + append_id,
+            title=None,
+            description=None,
+            thumbnail_url=thumbnail,
+            color=get_class_color(),
+            footer_text=self._get_footer(),
+        )
+
+        # Hook to allow template overrides
+        self._override_response_loop(response_id)
+
+        for field_id in range(self.__field_limit):
+            if position >= end:
+                break
+
+            name = "{0} - {1}".format(
+                start_value, min(start_value + self.__entry_limit - 1, num_entries)
+            )
+            value = ""
+
+            field_end = min(position + self.__entry_limit, end)
+            while position < field_end:
+                value += self._build_row(data_list[position], requester)
+                position += 1
+
+            self._embed.add_field(name, value, self.__multiple_columns)
+            self._override_field_loop(response_id, field_id)
+            start_value += self.__entry_limit
+
+        self.__response_list.append(self._embed.get())
+
+        return position
+
     def get(self):
         return self.__response_list
 
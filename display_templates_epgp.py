@@ -216,8 +216,6 @@ class EPGPMultipleResponse(MultipleResponse):
         def get_pr(i):
             return i.pr()
 
-        data_list.sort(key=get_pr, reverse=True)
-
         data_list_ep_min = min(data_list, key=get_ep)
         data_list_ep_max = max(data_list, key=get_ep)
         data_list_gp_min = min(data_list, key=get_gp)
@@ -14,6 +14,9 @@
 
 import re
 import json
+import bisect
+import operator
+import threading
 import collections
 from enum import Enum
 import pytz
@@ -21,8 +24,10 @@ import pytz
 from savedvariables_parser import SavedVariablesParser
 from bot_config import BotConfig
 from bot_logger import BotLogger, trace, trace_func_only, for_all_methods
-from bot_utility import timestamp_now
+from bot_utility import timestamp_now, public_to_dict
 from statistics import Statistics
+from build_cache import BuildCache
+from player_db_models import PlayerLoot, ItemValue, activity_clock
 import bot_memory_manager
 from display_templates import SUPPORT_SERVER
 from display_templates import get_bot_color, get_bot_links, preformatted_block, WoWVersion
@@ -37,6 +42,13 @@ from display_templates import (
     BotDisabledResponse,
 )
 
+# Loot and history entries are sorted on the plain attribute. Calling the
+# traced timestamp() per comparison key dominated sorting.
+_timestamp_key = operator.attrgetter("_timestamp")
+_dkp_key = operator.attrgetter("_dkp")
+# Item searches containing any of these are matched as regular expressions
+_REGEX_CHARACTERS = frozenset(".^$*+?{}[]\\|()")
+
 
 class ResponseStatus(Enum):
     SUCCESS = 0
@@ -66,7 +78,20 @@ class Response:
 class DKPBot:
     DEFAULT_TEAM = "0"
     REMINDER_FREQUENCY = 20  # Then every 20
+    RESPONSE_CACHE_SIZE = 32
+    DATABASE_FORMAT = 8  # Bump on database layout change to invalidate build cache
     __POSITIVE_ENTRY_THRESHOLD = 2
+    # Commands answered from the database only
+    __CACHED_COMMANDS = [
+        "dkp",
+        "epgp",
+        "history",
+        "loot",
+        "raidloot",
+        "item",
+        "value",
+        "rc",
+    ]
 
     __param_parser = re.compile(
         "\s*([\d\w\-!?+.:<>|*^'\"]*)[\s[\/\,]*"
@@ -104,12 +129,19 @@ class DKPBot:
         self.__db = {}
         self.__config = config
         self.__guild_id = int(guild_id)
+        self.trace_scope = self.__guild_id
         self.__channel = 0
         self.__announcement_channel = 0
         self.__announcement_mention_role = 0
         self._channel_team_map = collections.OrderedDict()
         self.__db_loaded = False
         self.__reminder_command_count = 5  # First reminder after 5 messages
+        self.__build_profile = {}
+        self.__sort_time = 0
+        # Bumped on every database or configuration change
+        self.__generation = 0
+        self.__response_cache = collections.OrderedDict()
+        self.__response_cache_lock = threading.Lock()
         self.__init_db_structure()
         self.statistics = Statistics()
         self._timezone = pytz.timezone("Europe/Paris")
@@ -249,12 +281,14 @@ class DKPBot:
     def database_set(self, database):
         self.__db = database
         self.__db_loaded = True
+        self.__invalidate_responses()
 
     # Try requesting garbage collecting
     def database_free(self):
         del self.__db
         self.__db = {}
         self.__db_loaded = False
+        self.__invalidate_responses()
 
     # Class related
     def _decode_alias_internal(self, group):
@@ -478,7 +512,11 @@ class DKPBot:
                 self.__guild_id
             )  # pylint: disable=no-value-for-parameter
             start = timestamp_now()
-            response = callback(param, request_info)  # pylint: disable=not-callable
+            key = self.__get_response_key(sanitized_command, param, request_info)
+            response = self.__get_cached_response(key)
+            if response is None:
+                response = callback(param, request_info)  # pylint: disable=not-callable
+                self.__cache_response(key, response)
             self.statistics.data[sanitized_command] = 1000 * (
                 timestamp_now() - start
             )  # miliseconds
@@ -488,6 +526,8 @@ class DKPBot:
                 "display",
             ]:  # inject reminder except on config/display calls
                 response = self.__reminder_injection(response)
+            else:
+                self.__invalidate_responses()
             return response
         elif sanitized_command.startswith("su_"):
             return Response(ResponseStatus.DELEGATE, (sanitized_command, param))
@@ -497,6 +537,68 @@ class DKPBot:
             )
             return Response(ResponseStatus.IGNORE)
 
+    ### Response cache ###
+
+    # None if the response can't be reused
+    def __get_response_key(self, command, param, request_info):
+        if command not in self.__CACHED_COMMANDS:
+            return None
+
+        param = " ".join(param.split())
+        # Numbers are Raid-Helper events there, signups change at any time
+        if command in ["dkp", "epgp"] and any(map(str.isdigit, param.split())):
+            return None
+
+        return (
+            command,
+            param,
+            self._get_channel_team_mapping(request_info["channel"]["id"]),
+            request_info["author"]["name"],
+            request_info.get("is_privileged"),
+            self.is_premium(),
+            activity_clock(),
+            self.__generation,
+        )
+
+    def __get_cached_response(self, key):
+        if key is None:
+            return None
+
+        with self.__response_cache_lock:
+            cached = self.__response_cache.get(key)
+            if cached is None:
+                return None
+            self.__response_cache.move_to_end(key)
+
+        (status, data) = cached
+        # Reminder is appended to the list
+        if isinstance(data, list):
+            data = list(data)
+        return Response(status, data)
+
+    def __cache_response(self, key, response):
+        if key is None or response.status != ResponseStatus.SUCCESS:
+            return
+
+        data = response.data
+        if isinstance(data, list):
+            if not all(isinstance(entry, (str, dict)) for entry in data):
+                return
+            data = list(data)
+        elif not isinstance(data, (str, dict)):
+            return
+
+        with self.__response_cache_lock:
+            self.__response_cache[key] = (response.status, data)
+            self.__response_cache.move_to_end(key)
+            while len(self.__response_cache) > self.RESPONSE_CACHE_SIZE:
+                self.__response_cache.popitem(False)
+
+    def __invalidate_responses(self):
+        with self.__response_cache_lock:
+            self.__generation += 1
+            self.__response_cache.clear()
+
     def handle(self, message, request_info):
         if len(message) > 0 and message[0] == self.__prefix:
             (command, param) = self.__parse_command(message)
@@ -509,8 +611,29 @@ class DKPBot:
 
     ### File handling and parsing ###
 
+    # Top-level SavedVariables read by the bot. None parses everything.
+    def _get_saved_variables_names(self):
+        return None
+
     def __get_saved_variables(self, input_string):
-        return SavedVariablesParser().parse_string(input_string)
+        return SavedVariablesParser().parse_string(
+            input_string, self._get_saved_variables_names()
+        )
+
+    # Build cache key: file content, bot type and settings used while building
+    def get_build_cache_key(self, input_bytes):
+        signature = json.dumps(
+            public_to_dict(self.__config.guild_info), sort_keys=True, default=str
+        )
+        return BuildCache().key(
+            input_bytes,
+            "{0}{1}{2}".format(type(self).__name__, self.DATABASE_FORMAT, signature),
+        )
+
+    def __set_database_info(self, info):
+        self.__db["info"]["comment"] = info.get("comment")
+        self.__db["info"]["date"] = info.get("date")
+        self.__db["info"]["author"] = info.get("author")
 
     def _db_get_info(self):
         return self.__db["info"]
@@ -532,6 +655,70 @@ class DKPBot:
     def _finalize_database(self):
         return
 
+    ### Incremental building ###
+
+    # Returns what a later upload needs to be compared against to extend the
+    # database built from saved_variable. None if it can only be rebuilt.
+    def _get_delta_state(self, saved_variable):  # pylint: disable=unused-argument
+        return None
+
+    # Returns what saved_variable adds to the database described by state or
+    # None if it doesn't only extend it. Resulting state goes under "state".
+    def _get_delta(self, saved_variable, state):  # pylint: disable=unused-argument
+        return None
+
+    # Builds from the previous database and the delta
+    def _build_delta_database(self, database, delta):  # pylint: disable=unused-argument
+        return False
+
+    # Takes over loot and history of database. Lists are copied so that the
+    # database keeps serving requests unchanged.
+    def _extend_database(self, database):
+        for team, team_data in database["global"].items():
+            extended_data = self.__db["global"].get(team)
+            if extended_data is None:
+                continue
+            extended_data["loot"] = list(team_data["loot"])
+            extended_data["player_loot"] = {
+                player: list(loot) for player, loot in team_data["player_loot"].items()
+            }
+            extended_data["history"] = {
+                player: list(history)
+                for player, history in team_data["history"].items()
+            }
+
+    # Moves entries added after _extend_database into place
+    def _merge_database(self, database):
+        for team, team_data in self.__db["global"].items():
+            previous_data = database["global"].get(team)
+            if previous_data is None:
+                previous_data = {"loot": [], "player_loot": {}, "history": {}}
+            type(self).__merge_sorted(team_data["loot"], len(previous_data["loot"]))
+            for key in ["player_loot", "history"]:
+                for player, entries in team_data[key].items():
+                    previous = previous_data[key].get(player)
+                    type(self).__merge_sorted(entries, len(previous) if previous else 0)
+
+    @staticmethod
+    def __merge_sorted(entries, length):
+        added = entries[length:]
+        if len(added) == 0:
+            return
+        del entries[length:]
+        # Newest first. Added entries follow entries of the same time, in
+        # upload order, as the stable sort of a full build places them
+        for entry in added:
+            timestamp = _timestamp_key(entry)
+            low = 0
+            high = len(entries)
+            while low < high:
+                middle = (low + high) // 2
+                if _timestamp_key(entries[middle]) >= timestamp:
+                    low = middle + 1
+                else:
+                    high = middle
+            entries.insert(low, entry)
+
     def dump_database(self):
         import pprint
         with open("dbdump.log", "w") as log_file:
@@ -552,13 +739,31 @@ class DKPBot:
             team_dkp_data.append(entry)
         return team_dkp_data
 
-    def _search_dkp(self, player, team):
-        team_data = self.__db["global"].get(team)
-        if team_data is None:
+    # Names starting with player, alphabetically. At most limit of them.
+    def _search_dkp(self, player, team, limit=None):
+        names = self.__db["names"].get(team)
+        if names is None:
             return None
-        players = team_data["dkp"].keys()
-        players = [p for p in players if p.lower().startswith(player)]
-        return players
+        prefix = player.lower()
+        first = bisect.bisect_left(names, prefix)
+        if len(prefix) > 0:
+            # First string after all those starting with prefix
+            end = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+            last = bisect.bisect_left(names, end, first)
+        else:
+            last = len(names)
+        if limit is not None:
+            last = min(last, first + limit)
+        return names[first:last]
+
+    # Player name or, if there is no such player, the only name starting with it
+    def _resolve_player_name(self, player, team):
+        if self._get_dkp(player, team):
+            return player
+        names = self._search_dkp(player, team, 2)
+        if names and len(names) == 1:
+            return names[0]
+        return player
 
     def _get_player_loot(self, player, team):
         team_data = self.__db["global"].get(team)
@@ -585,8 +790,12 @@ class DKPBot:
             # Database for all global data indexed by player name. Unsorted.
             "global": {},
             "group": {},  # Database for all grouped data. Indexed by group name. Sorted by DKP value descending
+            "standings": {},  # All players of the team in _get_standings_order()
+            "names": {},  # Player names of the team, sorted, for prefix search
+            "items": {},  # Item name trigrams, loot positions and values, for item search
             "time": 0,
             "info": {"comment": "", "date": "", "author": ""},
+            "delta": None,  # What later uploads are compared against. None if they can't extend the database
         }
 
     def __init_team_structure(self, team):
@@ -650,17 +859,15 @@ class DKPBot:
         self.__db["global"][team]["loot"].append(entry)
 
     def _sort_loot(self, newest=True, team=None):
+        start = timestamp_now()
         if team is None:
             for team_data in self.__db["global"].values():
-                team_data["loot"].sort(
-                    key=lambda info: info.timestamp(), reverse=bool(newest)
-                )
+                team_data["loot"].sort(key=_timestamp_key, reverse=bool(newest))
         else:
             team_data = self.__db["global"].get(team)
             if team_data is not None:
-                team_data["loot"].sort(
-                    key=lambda info: info.timestamp(), reverse=bool(newest)
-                )
+                team_data["loot"].sort(key=_timestamp_key, reverse=bool(newest))
+        self.__sort_time += timestamp_now() - start
 
     def _find_loot(self, keyword, team):
         if not keyword or not isinstance(keyword, str) or len(keyword) == 0:
@@ -670,7 +877,12 @@ class DKPBot:
         if team_data is None:
             return list()
 
-        loot_pattern = re.compile(keyword.strip(), flags=re.IGNORECASE)
+        keyword = keyword.strip()
+        index = self.__get_item_index(keyword, team)
+        if index is not None:
+            return self.__find_indexed_loot(keyword.lower(), index, team_data["loot"])
+
+        loot_pattern = re.compile(keyword, flags=re.IGNORECASE)
 
         def get_loot_if_matching(entry):
             if loot_pattern.search(entry.item_name()) is not None:
@@ -681,6 +893,111 @@ class DKPBot:
         matching_loot = list(map(get_loot_if_matching, team_data["loot"]))
         return list(filter(None, matching_loot))
 
+    # Values of items matching keyword, the most recently looted first
+    def _find_item_values(self, keyword, team):
+        if not keyword or not isinstance(keyword, str) or len(keyword) == 0:
+            return list()
+
+        index = self.__get_item_index(keyword.strip(), team)
+        if index is None:
+            values = list(type(self).__get_item_values(self._find_loot(keyword, team)))
+        else:
+            values = []
+            for name in type(self).__match_item_names(keyword.strip().lower(), index):
+                values.extend(index["values"].get(name, ()))
+            values.sort(key=ItemValue.first)
+
+        return [(value.item_id(), value.item_name(), value) for value in values]
+
+    # None if keyword can't be looked up in the index
+    def __get_item_index(self, keyword, team):
+        if len(keyword) < 3 or not _REGEX_CHARACTERS.isdisjoint(keyword):
+            return None
+        return self.__db["items"].get(team)
+
+    @staticmethod
+    def __find_indexed_loot(keyword, index, loot):
+        postings = index["postings"]
+        matching = DKPBot.__match_item_names(keyword, index)
+        count = sum(len(postings[name]) for name in matching)
+        # Same order as the loot list. Broad matches are cheaper to filter.
+        if count * 8 > len(loot):
+            matching = set(matching)
+            return [entry for entry in loot if entry._item_name in matching]
+        positions = []
+        for name in matching:
+            positions.extend(postings[name])
+        positions.sort()
+        return [loot[position] for position in positions]
+
+    # Only names containing all trigrams of keyword are compared
+    @staticmethod
+    def __match_item_names(keyword, index):
+        trigrams = index["trigrams"]
+        keyword_trigrams = {keyword[i : i + 3] for i in range(len(keyword) - 2)}
+        candidates = None
+        for trigram in sorted(keyword_trigrams, key=lambda t: len(trigrams.get(t, ()))):
+            names = trigrams.get(trigram)
+            if not names:
+                return []
+            if candidates is None:
+                candidates = names
+            else:
+                candidates = candidates.intersection(names)
+            if not candidates:
+                return []
+
+        return [name for name in candidates if keyword in name.lower()]
+
+    # ItemValue per item id and name, in order of the first loot entry
+    @staticmethod
+    def __get_item_values(loot):
+        costs = {}
+        first = {}
+        for position, entry in enumerate(loot):
+            if not isinstance(entry, PlayerLoot):
+                continue
+            key = (entry._item_id, entry._item_name)
+            item_costs = costs.get(key)
+            if item_costs is None:
+                costs[key] = [entry._dkp]
+                first[key] = position
+            else:
+                item_costs.append(entry._dkp)
+
+        for (item_id, item_name), item_costs in costs.items():
+            yield ItemValue(item_id, item_name, first[(item_id, item_name)], item_costs)
+
+    def __build_item_index(self):
+        for team, team_data in self.__db["global"].items():
+            postings = {}
+            for position, entry in enumerate(team_data["loot"]):
+                item_postings = postings.get(entry._item_name)
+                if item_postings is None:
+                    postings[entry._item_name] = [position]
+                else:
+                    item_postings.append(position)
+
+            trigrams = {}
+            for name in postings:
+                lower = name.lower()
+                for i in range(len(lower) - 2):
+                    trigram = lower[i : i + 3]
+                    if trigram in trigrams:
+                        trigrams[trigram].add(name)
+                    else:
+                        trigrams[trigram] = {name}
+
+            values = {}
+            for value in type(self).__get_item_values(team_data["loot"]):
+                values.setdefault(value.item_name(), []).append(value)
+
+            self.__db["items"][team] = {
+                "postings": postings,
+                "trigrams": trigrams,
+                "values": values,
+            }
+
     def _validate_player(self, player, team):
         if player is None:
             return False
@@ -709,27 +1026,27 @@ class DKPBot:
     def _sort_player_loot(self, newest=True, player=None, team=None):
         if team is None:
             for team_data in self.__db["global"].values():
-                if team_data["player_loot"].get(player):
-                    team_data["player_loot"][player].sort(
-                        key=lambda info: info.timestamp(), reverse=bool(newest)
-                    )
-                else:
-                    for loot in team_data["player_loot"].values():
-                        loot.sort(
-                            key=lambda info: info.timestamp(), reverse=bool(newest)
-                        )
+                self.__sort_entries(
+                    team_data["player_loot"], player, _timestamp_key, newest
+                )
         else:
             team_data = self.__db["global"].get(team)
             if team_data is None:
                 return None
 
-            if team_data["player_loot"].get(player):
-                team_data["player_loot"][player].sort(
-                    key=lambda info: info.timestamp(), reverse=bool(newest)
-                )
-            else:
-                for loot in team_data["player_loot"].values():
-                    loot.sort(key=lambda info: info.timestamp(), reverse=bool(newest))
+            self.__sort_entries(
+                team_data["player_loot"], player, _timestamp_key, newest
+            )
+
+    # Sorts entries under name or, if there are none, all of them
+    def __sort_entries(self, entries, name, key, reverse):
+        start = timestamp_now()
+        if entries.get(name):
+            entries[name].sort(key=key, reverse=bool(reverse))
+        else:
+            for named_entries in entries.values():
+                named_entries.sort(key=key, reverse=bool(reverse))
+        self.__sort_time += timestamp_now() - start
 
     def _add_history_to_all_players(self, entry, team):
         team_data = self.__db["global"].get(team)
@@ -758,46 +1075,33 @@ class DKPBot:
     def _sort_history(self, newest=True, player=None, team=None):
         if team is None:
             for team_data in self.__db["global"].values():
-                if team_data["history"].get(player):
-                    team_data["history"][player].sort(
-                        key=lambda info: info.timestamp(), reverse=bool(newest)
-                    )
-                else:
-                    for loot in team_data["history"].values():
-                        loot.sort(
-                            key=lambda info: info.timestamp(), reverse=bool(newest)
-                        )
+                self.__sort_entries(
+                    team_data["history"], player, _timestamp_key, newest
+                )
         else:
             team_data = self.__db["global"].get(team)
             if team_data is None:
                 return None
 
-            if team_data["history"].get(player):
-                team_data["history"][player].sort(
-                    key=lambda info: info.timestamp(), reverse=bool(newest)
-                )
-            else:
-                for loot in team_data["history"].values():
-                    loot.sort(key=lambda info: info.timestamp(), reverse=bool(newest))
+            self.__sort_entries(
+                team_data["history"], player, _timestamp_key, newest
+            )
+
+    # Standings and groups order: (key, descending)
+    def _get_standings_order(self):
+        return (_dkp_key, True)
 
     def _sort_group_dkp(self, group=None, team=None):
+        (key, reverse) = self._get_standings_order()
         if team is None:
             for team_data in self.__db["group"].values():
-                if team_data.get(group):
-                    team_data[group].sort(key=lambda info: info.dkp(), reverse=True)
-                else:
-                    for values in team_data.values():
-                        values.sort(key=lambda info: info.dkp(), reverse=True)
+                self.__sort_entries(team_data, group, key, reverse)
         else:
             team_data = self.__db["group"].get(team)
             if team_data is None:
                 return None
 
-            if team_data.get(group):
-                team_data[group].sort(key=lambda info: info.dkp(), reverse=True)
-            else:
-                for values in team_data.values():
-                    values.sort(key=lambda info: info.dkp(), reverse=True)
+            self.__sort_entries(team_data, group, key, reverse)
 
     def _set_group_dkp(self, group, entry, team, sort=False):
         if group:
@@ -805,13 +1109,56 @@ class DKPBot:
             team_data = self.__db["group"].get(team)
             if team_data is None:
                 self.__init_team_structure(team)
+                team_data = self.__db["group"].get(team)
 
             if not group in team_data.keys():
                 team_data[group] = []
 
-            team_data[group].append(entry)
             if sort:
-                self._sort_group_dkp(group)
+                (key, reverse) = self._get_standings_order()
+                type(self).__insert_ordered(team_data[group], entry, key, reverse)
+            else:
+                team_data[group].append(entry)
+
+    # Inserts after entries ordered the same, as a stable sort would
+    @staticmethod
+    def __insert_ordered(entries, entry, key, reverse):
+        value = key(entry)
+        low = 0
+        high = len(entries)
+        while low < high:
+            middle = (low + high) // 2
+            if (key(entries[middle]) < value) if reverse else (key(entries[middle]) > value):
+                high = middle
+            else:
+                low = middle + 1
+        entries.insert(low, entry)
+
+    # Standings and groups are ordered once, after all players are known
+    def __build_standings(self):
+        start = timestamp_now()
+        (key, reverse) = self._get_standings_order()
+        for team, team_data in self.__db["global"].items():
+            self.__db["standings"][team] = sorted(
+                team_data["dkp"].values(), key=key, reverse=reverse
+            )
+            self.__db["names"][team] = sorted(team_data["dkp"])
+        self.__sort_time += timestamp_now() - start
+        self._sort_group_dkp()
+
+    def _get_team_standings(self, team):
+        standings = self.__db["standings"].get(team)
+        if standings is None:
+            return []
+        return list(standings)
+
+    # Returns players in standings order
+    def _order_by_standings(self, players, team):
+        standings = self.__db["standings"].get(team)
+        if standings is None:
+            return players
+        selected = set(map(id, players))
+        return [info for info in standings if id(info) in selected]
 
     def _get_group_dkp(self, group, team):
         team_data = self.__db["group"].get(team)
@@ -843,64 +1190,142 @@ class DKPBot:
     def _set_player_latest_positive_history_and_activity(
         self, inactive_time=200000000000
     ):
-        now = timestamp_now(True)
-        for team, team_data in self.__db["global"].items():
-            for dkp in team_data["dkp"].values():
+        threshold = self.__POSITIVE_ENTRY_THRESHOLD
+        for team_data in self.__db["global"].values():
+            # History is newest first, so only its head is ever visited
+            all_history = team_data["history"]
+            for name, dkp in team_data["dkp"].items():
                 dkp.set_inactive()
+                history = all_history.get(name)
+                if not history or not isinstance(history, list):
+                    continue
+
                 positive_entry_count = 0
-                history = self._get_history(dkp.name(), team)
-                if history and isinstance(history, list):
-                    for history_entry in history:
-                        if history_entry.dkp() > 0:
-                            if positive_entry_count == 0:
-                                dkp.set_latest_history_entry(history_entry)
-                            if abs(now - history_entry.timestamp()) <= inactive_time:
-                                positive_entry_count = positive_entry_count + 1
-                                if (
-                                    positive_entry_count
-                                    >= self.__POSITIVE_ENTRY_THRESHOLD
-                                ):
-                                    dkp.set_active()
-                                    break
-                            else:
-                                break
+                for history_entry in history:
+                    if history_entry._dkp <= 0:
+                        continue
+                    if positive_entry_count == 0:
+                        dkp.set_latest_history_entry(history_entry)
+                        newest = history_entry._timestamp
+                    positive_entry_count += 1
+                    if positive_entry_count >= threshold:
+                        # Active while both the newest and the threshold
+                        # entry are within inactive_time of now
+                        dkp.set_active_between(
+                            newest - inactive_time,
+                            history_entry._timestamp + inactive_time,
+                        )
+                        break
 
     # This method handles response differently. ERROR status is printed also
-    def build_database(self, input_string, info):
+    def build_database(self, input_string, info, cache_key=None):
         if not self.is_enabled():
             return Response(ResponseStatus.SUCCESS, BotDisabledResponse().get())
 
+        # Build into a separate bot so the current database keeps serving
+        # requests and survives a failed build
+        state = self.get_delta_state()
+        builder = type(self)(self.__guild_id, self.__config)
+        (response, delta) = builder.build_or_get_delta(input_string, info, state)
+        if delta is not None:
+            response = self.extend_database(delta, state, info, cache_key)
+            if response is not None:
+                self.record_build_profile(builder.get_build_profile())
+                return response
+            # Rare enough to just parse again
+            self.record_build_profile(builder.get_build_profile())
+            (response, _) = builder.build_or_get_delta(input_string, info)
+
+        self.__install_built_database(builder, info, cache_key)
+        self.record_build_profile(builder.get_build_profile())
+
+        return response
+
+    # Returns None if the input needs a full build after all, e.g. the loaded
+    # database is no longer the one state describes
+    def extend_database(self, delta, state, info, cache_key=None):
+        if not self.is_enabled():
+            return Response(ResponseStatus.SUCCESS, BotDisabledResponse().get())
+
+        if state is None or self.get_delta_state() is not state:
+            return None
+
+        builder = type(self)(self.__guild_id, self.__config)
+        response = builder.__extend_database(self.__db, delta, info)
+        if response is not None:
+            self.__install_built_database(builder, info, cache_key)
+            self.record_build_profile(builder.get_build_profile())
+
+        return response
+
+    def __install_built_database(self, builder, info, cache_key):
+        if builder.is_database_loaded():
+            self.install_database(builder.database_get(), info)
+            if cache_key is not None:
+                BuildCache().put(cache_key, self.__db)
+
+    def get_delta_state(self):
+        if not self.is_database_loaded():
+            return None
+        return self.__db.get("delta")
+
+    # Builds the database unless the input only extends the one described by
+    # state. Then nothing is built and the delta is returned instead.
+    def build_or_get_delta(self, input_string, info, state=None):
         start = timestamp_now()
+        self.__build_profile = {}
+        self.__sort_time = 0
 
         saved_variable = None
         try:
             saved_variable = self.__get_saved_variables(input_string)
             if saved_variable is None:
                 raise AttributeError
-        except AttributeError:
-            BotLogger().get().error("Error Parsing .lua file.")
-            return Response(
-                ResponseStatus.SUCCESS,
-                BasicCritical(
-                    "Error Parsing .lua file. Check if you have provided proper savedvariable file."
-                ).get(),
+        except (AttributeError, ValueError) as exception:
+            BotLogger().get().error("Error Parsing .lua file. %s", exception)
+            return (
+                Response(
+                    ResponseStatus.SUCCESS,
+                    BasicCritical(
+                        "Error Parsing .lua file. Check if you have provided proper savedvariable file."
+                    ).get(),
+                ),
+                None,
             )
 
-        if not isinstance(saved_variable, dict):
+        if not isinstance(saved_variable, dict) or len(saved_variable) == 0:
             BotLogger().get().error("No SavedVariables found in .lua file.")
-            return Response(
-                ResponseStatus.SUCCESS,
-                BasicCritical(
-                    "No SavedVariables found in .lua file. Check if you have provided proper savedvariable file."
-                ).get(),
+            return (
+                Response(
+                    ResponseStatus.SUCCESS,
+                    BasicCritical(
+                        "No SavedVariables found in .lua file. Check if you have provided proper savedvariable file."
+                    ).get(),
+                ),
+                None,
             )
 
-        self.__init_db_structure()
+        self.__profile_stage(
+            "parse", (start, self.__sort_time), len(input_string), "chars"
+        )
 
-        self.__db["info"]["comment"] = info.get("comment")
-        self.__db["info"]["date"] = info.get("date")
-        self.__db["info"]["author"] = info.get("author")
+        if state is not None:
+            delta = self._get_delta(saved_variable, state)
+            if delta is not None:
+                BotLogger().get().info(
+                    "Upload extends the loaded database. Parsed in {:04.2f} seconds".format(
+                        timestamp_now() - start
+                    )
+                )
+                return (None, delta)
+
+        return (self.__build_database(saved_variable, info, start), None)
 
+    def __build_database(self, saved_variable, info, start):
+        self.__init_db_structure()
+        self.__set_database_info(info)
+
+        stage = self.__start_stage()
         if not self._build_config_database(saved_variable):
             BotLogger().get().error(
                 "Configuration Database building failed. Please validate your settings."
@@ -911,6 +1336,9 @@ class DKPBot:
                     "Configuration Database building failed. Please validate your settings."
                 ).get(),
             )
+        self.__profile_stage("config", stage)
+
+        stage = self.__start_stage()
         if not self._build_dkp_database(saved_variable):
             BotLogger().get().error("Profile Database building failed.")
             return Response(
@@ -919,6 +1347,9 @@ class DKPBot:
                     "Profile Database building failed. Please validate your settings."
                 ).get(),
             )
+        self.__profile_stage("dkp", stage, self.__count_entries("dkp"))
+
+        stage = self.__start_stage()
         if not self._build_loot_database(saved_variable):
             BotLogger().get().error("Loot Database building failed.")
             return Response(
@@ -927,6 +1358,9 @@ class DKPBot:
                     "Loot Database building failed. Please validate your settings."
                 ).get(),
             )
+        self.__profile_stage("loot", stage, self.__count_entries("loot"))
+
+        stage = self.__start_stage()
         if not self._build_history_database(saved_variable):
             BotLogger().get().error("History Database building failed.")
             return Response(
@@ -935,15 +1369,17 @@ class DKPBot:
                     "History Database building failed. Please validate your settings."
                 ).get(),
             )
+        self.__profile_stage("history", stage, self.__count_entries("history"))
 
-        self._finalize_database()
+        self.__build_standings()
+        self.__finalize_build(
+            self.__count_entries("loot") + self.__count_entries("history")
+        )
 
         BotLogger().get().info(
             "Building complete in {:04.2f} seconds".format(timestamp_now() - start)
         )
 
-        self.__log_database_statistics()
-
         for team in self.__db["global"]:
             for table in team:
                 if len(table) <= 0:
@@ -961,12 +1397,107 @@ class DKPBot:
                     BasicError("Group Database building failed.").get(),
                 )
 
+        self.__db["delta"] = self._get_delta_state(saved_variable)
+        self.__db_loaded = True
+
+        return Response(
+            ResponseStatus.SUCCESS, BasicSuccess("Database building complete.").get()
+        )
+
+    def __extend_database(self, database, delta, info):
+        start = timestamp_now()
+
+        self.__init_db_structure()
+        self.__set_database_info(info)
+
+        stage = self.__start_stage()
+        if not self._build_delta_database(database, delta):
+            BotLogger().get().warning("Database extending failed.")
+            return None
+        self.__profile_stage("extend", stage)
+
+        # New entries are merged in place, only standings are sorted
+        self.__build_standings()
+        self.__finalize_build(self.__count_entries("dkp"))
+
+        BotLogger().get().info(
+            "Extending complete in {:04.2f} seconds".format(timestamp_now() - start)
+        )
+
+        self.__db["delta"] = delta.get("state")
         self.__db_loaded = True
 
         return Response(
             ResponseStatus.SUCCESS, BasicSuccess("Database building complete.").get()
         )
 
+    ### Build profiling ###
+
+    # Stage: (seconds, count, unit) of the last build of this bot. Sorting is
+    # accounted to its own stage, whichever stage did it.
+    def get_build_profile(self):
+        return self.__build_profile
+
+    def record_build_profile(self, profile):
+        for stage, (seconds, count, unit) in profile.items():
+            self.statistics.build["{0} [ms]".format(stage)] = 1000 * seconds
+            if count and seconds > 0:
+                self.statistics.build["{0} [{1}/s]".format(stage, unit)] = (
+                    count / seconds
+                )
+
+    def __start_stage(self):
+        return (timestamp_now(), self.__sort_time)
+
+    def __profile_stage(self, stage, start, count=None, unit="entries"):
+        (timestamp, sort_time) = start
+        seconds = timestamp_now() - timestamp - (self.__sort_time - sort_time)
+        self.__build_profile[stage] = (seconds, count, unit)
+
+    def __finalize_build(self, sorted_count):
+        self.__build_profile["sort"] = (self.__sort_time, sorted_count, "entries")
+        stage = self.__start_stage()
+        self.__build_item_index()
+        self._finalize_database()
+        self.__profile_stage("finalize", stage, self.__count_entries("dkp"))
+
+    def __count_entries(self, table):
+        count = 0
+        for team_data in self.__db["global"].values():
+            if table == "history":
+                count += sum(map(len, team_data[table].values()))
+            else:
+                count += len(team_data[table])
+        return count
+
+    # Returns None if there is no database built from the same input
+    def restore_database(self, cache_key, info):
+        if not self.is_enabled():
+            return Response(ResponseStatus.SUCCESS, BotDisabledResponse().get())
+
+        database = BuildCache().get(cache_key)
+        if database is None:
+            return None
+
+        self.install_database(database, info)
+
+        BotLogger().get().info("Database restored from build cache")
+
+        return Response(
+            ResponseStatus.SUCCESS, BasicSuccess("Database building complete.").get()
+        )
+
+    # Everything needed to build the same database in another process
+    def get_build_arguments(self):
+        return (self.__guild_id, self.__config)
+
+    # Installs a complete database built elsewhere
+    def install_database(self, database, info):
+        self.database_set(database)
+        self.__set_database_info(info)
+        self._update_views_info()
+        self.__log_database_statistics()
+
     # Setting Handlers
     def __set_config(self, group, config, value):
         internal_group = getattr(self.__config, group, None)
@@ -1465,7 +1996,7 @@ class DKPBot:
         help_string += "Display DKP history for specified `player`.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "history player", "")
         )
-        help_string += "Display N-th history page for specified `player`.\n{0}\n".format(
+        help_string += "Display N-th history page for specified `player`. Each page is a single message, independent of the `messages` display setting. First page is 0.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "history player N", "")
         )
         help_string += "Display latest loot for the requester.\nUses Discord server nickname if set, Discord username otherwise.\n{0}\n".format(
@@ -1474,7 +2005,7 @@ class DKPBot:
         help_string += "Display latest loot for specified `player`.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "loot player", "")
         )
-        help_string += "Display N-th loot page for specified `player`.\n{0}\n".format(
+        help_string += "Display N-th loot page for specified `player`. Each page is a single message, independent of the `messages` display setting. First page is 0.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "loot player N", "")
         )
 
@@ -1487,7 +2018,7 @@ class DKPBot:
             preformatted_block(self.get_prefix() + "raidloot", "")
             + preformatted_block("Supporter only command", "css")
         )
-        help_string += "Display N-th page of loot entries from raids.\n{0}\n".format(
+        help_string += "Display N-th page of loot entries from raids. Each page is a single message, independent of the `messages` display setting. First page is 0.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "raidloot N", "")
             + preformatted_block("Supporter only command", "css")
         )
@@ -15,7 +15,13 @@
 import re
 
 from dkp_bot import DKPBot, Response, ResponseStatus
-from player_db_models import PlayerInfo, PlayerInfoBasic, PlayerDKPHistory, PlayerLoot
+from player_db_models import (
+    PlayerInfo,
+    PlayerInfoBasic,
+    AwardEvent,
+    PlayerDKPHistory,
+    PlayerLoot,
+)
 from player_role import RoleFilter
 from display_templates import (
     BasicCritical,
@@ -31,7 +37,6 @@ from display_templates import (
 )
 from bot_logger import BotLogger, trace, trace_func_only, for_all_methods
 from raidhelper import RaidHelper
-from statistics import Statistics
 
 
 @for_all_methods(trace, trace_func_only)
@@ -42,6 +47,9 @@ class EssentialDKPBot(DKPBot):
     _LOOT_SV = "MonDKP_Loot"
     _HISTORY_SV = "MonDKP_DKPHistory"
     _45_DAYS_SECONDS = 3888000
+    # Entries keep the players of the build that created them. Rebuilding
+    # fully now and then lets go of the older ones.
+    _MAX_DELTA_BUILDS = 20
 
     # Matches either a,b,c,d or A / B or A \ B
     __item_id_name_find = re.compile(
@@ -155,23 +163,32 @@ class EssentialDKPBot(DKPBot):
             output_result_list, requester
         ).get()
 
-    def _build_history_output_multiple(self, output_result_list):
+    def _build_history_output_multiple(self, output_result_list, page=None):
         if not output_result_list or not isinstance(output_result_list, list):
             return None
 
-        return self._multiple_history_output_builder.build(output_result_list).get()
+        if page is None:
+            return self._multiple_history_output_builder.build(output_result_list).get()
+
+        return self._multiple_history_output_builder.build_page(output_result_list, page).get()
 
-    def _build_player_loot_output_multiple(self, output_result_list):
+    def _build_player_loot_output_multiple(self, output_result_list, page=None):
         if not output_result_list or not isinstance(output_result_list, list):
             return None
 
-        return self._multiple_player_loot_output_builder.build(output_result_list).get()
+        if page is None:
+            return self._multiple_player_loot_output_builder.build(output_result_list).get()
+
+        return self._multiple_player_loot_output_builder.build_page(output_result_list, page).get()
 
-    def _build_loot_output_multiple(self, output_result_list):
+    def _build_loot_output_multiple(self, output_result_list, page=None):
         if not output_result_list or not isinstance(output_result_list, list):
             return None
 
-        return self._multiple_loot_output_builder.build(output_result_list).get()
+        if page is None:
+            return self._multiple_loot_output_builder.build(output_result_list).get()
+
+        return self._multiple_loot_output_builder.build_page(output_result_list, page).get()
 
     def _build_item_search_output_multiple(self, output_result_list):
         if not output_result_list or not isinstance(output_result_list, list):
@@ -190,6 +207,9 @@ class EssentialDKPBot(DKPBot):
 
     ### Database - Variables parsing ###
 
+    def _get_saved_variables_names(self):
+        return [self._CONFIG_SV, self._DKP_SV, self._LOOT_SV, self._HISTORY_SV]
+
     def _get_item_id_name(self, loot):
         # [0] -> id [1] -> name
         return list(filter(None, type(self).__item_id_name_find.findall(loot)))
@@ -213,19 +233,23 @@ class EssentialDKPBot(DKPBot):
                 team,
             )
         elif isinstance(players, list) and isinstance(dkp, (int, float)):
+            # One award event shared by every player of the entry
+            event = AwardEvent(timestamp, reason, index)
+            dkp = float(dkp)
             for player in players:
                 player_info = self._get_dkp(player, team)
                 if player_info is None:
                     continue
                 self._add_history(
                     player,
-                    PlayerDKPHistory(player_info, dkp, timestamp, reason, index),
+                    PlayerDKPHistory.from_event(player_info, dkp, event),
                     team,
                 )
         elif isinstance(players, list) and isinstance(dkp, list):
             # Remove the % entry
             del players[-1]
             del dkp[-1]
+            event = AwardEvent(timestamp, reason, index)
             # In case of unequal length we only add as many entries as there are players
             for player in players:
                 player_info = self._get_dkp(player, team)
@@ -234,9 +258,7 @@ class EssentialDKPBot(DKPBot):
                     continue
                 self._add_history(
                     player,
-                    PlayerDKPHistory(
-                        player_info, float(dkp.pop(0)), timestamp, reason, index
-                    ),
+                    PlayerDKPHistory.from_event(player_info, dkp.pop(0), event),
                     team,
                 )
         else:
@@ -541,15 +563,199 @@ class EssentialDKPBot(DKPBot):
         self._multiple_item_search_output_builder.set_info(info)
         self._multiple_item_value_output_builder.set_info(info)
 
+    ### Database - Incremental building ###
+
+    # Entries per team of a SavedVariable
+    def _get_team_entries(self, saved_variable, name):
+        entries = saved_variable.get(name)
+        if not entries:
+            return None
+
+        return {DKPBot.DEFAULT_TEAM: entries}
+
+    def __get_delta_teams(self, saved_variable):
+        dkp = self._get_team_entries(saved_variable, self._DKP_SV)
+        loot = self._get_team_entries(saved_variable, self._LOOT_SV)
+        history = self._get_team_entries(saved_variable, self._HISTORY_SV)
+        if not dkp or not loot or not history:
+            return None
+
+        teams = {}
+        for team, dkp_list in dkp.items():
+            team_lists = []
+            for entries in [dkp_list, loot.get(team, []), history.get(team, [])]:
+                # dict because there may be ["seed"] field...
+                if isinstance(entries, dict):
+                    entries = entries.values()
+                elif not isinstance(entries, list):
+                    return None
+                team_lists.append([entry for entry in entries if isinstance(entry, dict)])
+            teams[team] = team_lists
+
+        return teams
+
+    @staticmethod
+    def __get_roster(dkp_list):
+        return {
+            str(entry.get("player")).lower(): (
+                entry.get("class"),
+                entry.get("role"),
+                entry.get("spec"),
+            )
+            for entry in dkp_list
+        }
+
+    @staticmethod
+    def __get_indexes(entries):
+        indexes = set()
+        for entry in entries:
+            index = entry.get("index")
+            if index is None or index in indexes:
+                return None
+            indexes.add(index)
+
+        return indexes
+
+    # None if an entry built before is gone or a new one deletes another
+    @staticmethod
+    def __get_new_entries(entries, indexes):
+        new_entries = []
+        found = set()
+        for entry in entries:
+            index = entry.get("index")
+            if index is None or index in found:
+                return None
+            found.add(index)
+            if index in indexes:
+                continue
+            if entry.get("deletes"):
+                return None
+            new_entries.append(entry)
+
+        if len(found) - len(new_entries) != len(indexes):
+            return None
+
+        return new_entries
+
+    def _get_delta_state(self, saved_variable):
+        teams = self.__get_delta_teams(saved_variable)
+        if teams is None:
+            return None
+
+        state = {"builds": 0, "teams": {}}
+        for team, (dkp_list, loot_list, history) in teams.items():
+            loot_indexes = type(self).__get_indexes(loot_list)
+            history_indexes = type(self).__get_indexes(history)
+            if loot_indexes is None or history_indexes is None:
+                return None
+            state["teams"][team] = {
+                "roster": type(self).__get_roster(dkp_list),
+                "loot": loot_indexes,
+                "history": history_indexes,
+            }
+
+        return state
+
+    # Extends only if the roster is the same. Entries of players that were
+    # missing before would need a full build to be picked up.
+    def _get_delta(self, saved_variable, state):
+        if state["builds"] >= self._MAX_DELTA_BUILDS:
+            return None
+
+        config = saved_variable.get(self._CONFIG_SV)
+        teams = self.__get_delta_teams(saved_variable)
+        if not config or teams is None or teams.keys() != state["teams"].keys():
+            return None
+
+        delta = {
+            "config": config,
+            "teams": {},
+            "state": {"builds": state["builds"] + 1, "teams": {}},
+        }
+        for team, (dkp_list, loot_list, history) in teams.items():
+            team_state = state["teams"][team]
+            if type(self).__get_roster(dkp_list) != team_state["roster"]:
+                return None
+
+            new_loot = type(self).__get_new_entries(loot_list, team_state["loot"])
+            new_history = type(self).__get_new_entries(history, team_state["history"])
+            if new_loot is None or new_history is None:
+                return None
+
+            delta["teams"][team] = {
+                "dkp": dkp_list,
+                "loot": new_loot,
+                "history": new_history,
+            }
+            delta["state"]["teams"][team] = {
+                "roster": team_state["roster"],
+                "loot": team_state["loot"].union(
+                    entry["index"] for entry in new_loot
+                ),
+                "history": team_state["history"].union(
+                    entry["index"] for entry in new_history
+                ),
+            }
+
+        return delta
+
+    def _build_delta_database(self, database, delta):
+        if not self._build_config_database({self._CONFIG_SV: delta["config"]}):
+            return False
+
+        # Changed DKP rows. Every player is recreated as they are cheap
+        for team, team_delta in delta["teams"].items():
+            for entry in team_delta["dkp"]:
+                info = self._generate_player_info(entry)
+                if info is None:
+                    continue
+
+                self._set_dkp(info.name(), info, team)
+                self._set_group_dkp(info.ingame_class(), info, team)
+
+        self._extend_database(database)
+
+        for team, team_delta in delta["teams"].items():
+            for entry in team_delta["loot"]:
+                player_loot = self._generate_player_loot(entry, team)
+                if player_loot is None:
+                    continue
+
+                self._add_loot(player_loot, team)
+                self._add_player_loot(player_loot.player().name(), player_loot, team)
+
+            for entry in team_delta["history"]:
+                self._generate_player_history(entry, team)
+
+        self._merge_database(database)
+        self._set_player_latest_loot()
+        self._set_player_latest_positive_history_and_activity(self._45_DAYS_SECONDS)
+
+        return True
+
     ### Commands ###
 
-    def _get_dkp_target_results(self, team, targets, original, smart_roles_decoder):
+    # Only targets typed by the requester may be partial player names,
+    # Raid-Helper signups and aliases are always matched exactly
+    def _get_dkp_target_results(
+        self, team, targets, original, smart_roles_decoder, partial_names=False
+    ):
 
         output_result_list_single = []
         output_result_list_group = []
         if smart_roles_decoder is not None:  # smart roles
             for target in targets:  # iterate to get all single player mixins
                 info = self._get_dkp(target, team)
+                if (
+                    partial_names
+                    and not isinstance(info, PlayerInfoBasic)
+                    and target not in self._classes
+                    and target not in self._aliases
+                ):
+                    # Partial name
+                    info = self._get_dkp(
+                        self._resolve_player_name(target, team), team
+                    )
                 if isinstance(info, PlayerInfoBasic):
                     output_result_list_single.append(info)
             for target in self._classes:  # Get data for all classess supported
@@ -586,6 +792,13 @@ class EssentialDKPBot(DKPBot):
                         for info in group_info:
                             if info and isinstance(info, PlayerInfoBasic):
                                 output_result_list_group.append(info)
+                    elif partial_names and target not in self._aliases:
+                        # Partial name
+                        info = self._get_dkp(
+                            self._resolve_player_name(target, team), team
+                        )
+                        if isinstance(info, PlayerInfoBasic):
+                            output_result_list_single.append(info)
 
         # Filter non unique
         return list(set(output_result_list_single + output_result_list_group))
@@ -619,7 +832,7 @@ class EssentialDKPBot(DKPBot):
         raid_helper_filter = len(signed) > 0
 
         if "all" in original:
-            output_result_list = self._get_team_dkp(team)
+            output_result_list = self._get_team_standings(team)
         else:
             if len(targets) == len(int_list) and raid_helper_filter:
                 output_result_list = self._get_dkp_target_results(
@@ -627,7 +840,7 @@ class EssentialDKPBot(DKPBot):
                 )
             elif len(targets) > 0:
                 output_result_list = self._get_dkp_target_results(
-                    team, targets, original, smart_roles_filter
+                    team, targets, original, smart_roles_filter, True
                 )
                 if self.is_premium() and raid_helper_filter:
                     output_result_list = list(
@@ -649,7 +862,7 @@ class EssentialDKPBot(DKPBot):
         if len(output_result_list) == 1:
             data = self._build_dkp_output_single(output_result_list[0])
         elif len(output_result_list) > 0:
-            output_result_list.sort(key=lambda info: info.dkp(), reverse=True)
+            output_result_list = self._order_by_standings(output_result_list, team)
             data = self._build_dkp_output_multiple(
                 output_result_list, request_info["author"]["name"]
             )
@@ -662,21 +875,11 @@ class EssentialDKPBot(DKPBot):
 
     @staticmethod
     def _calculate_pagination(config, int_list):
-        if config.separate_messages == 0:
-            return 0
+        # Unlimited responses or no page requested - render everything
+        if config.separate_messages == 0 or len(int_list) == 0:
+            return None
 
-        pagination = 0
-        if len(int_list) > 0:
-            pagination = min(int_list)
-            if pagination > 10000:
-                pagination = 10000
-
-        return (
-            pagination
-            * config.entries_per_field
-            * config.fields
-            * config.separate_messages
-        )
+        return max(0, min(min(int_list), 10000))
 
     def call_history(self, param, request_info):  # pylint: disable=unused-argument
         if not self.is_database_loaded():
@@ -692,7 +895,7 @@ class EssentialDKPBot(DKPBot):
             team = self._get_channel_team_mapping(request_info["channel"]["id"])
             for target in targets:
                 # Single player
-                info = self._get_history(target, team)
+                info = self._get_history(self._resolve_player_name(target, team), team)
                 if info and isinstance(info, list):
                     output_result_list = info
                     break  # Yes single only
@@ -704,13 +907,11 @@ class EssentialDKPBot(DKPBot):
 
         BotLogger().get().debug("Output Result List: %s", output_result_list)
         if len(output_result_list) > 0:
-            pagination = type(self)._calculate_pagination(
+            page = type(self)._calculate_pagination(
                 self._get_config().dkp_history, int_list
             )
-            output_result_list = output_result_list[pagination:]
-            if len(output_result_list) > 0:
-                data = self._build_history_output_multiple(output_result_list)
-            else:
+            data = self._build_history_output_multiple(output_result_list, page)
+            if not data:
                 data = BasicError("Requested too old history data.").get()
         else:
             data = BasicError(
@@ -733,7 +934,9 @@ class EssentialDKPBot(DKPBot):
             team = self._get_channel_team_mapping(request_info["channel"]["id"])
             for target in targets:
                 # Single player
-                info = self._get_player_loot(target, team)
+                info = self._get_player_loot(
+                    self._resolve_player_name(target, team), team
+                )
                 if info and isinstance(info, list):
                     output_result_list = info
                     break  # Yes single only
@@ -743,15 +946,13 @@ class EssentialDKPBot(DKPBot):
                 BasicError("Unable to find data for {0}.".format(param)).get(),
             )
 
-        pagination = type(self)._calculate_pagination(
+        page = type(self)._calculate_pagination(
             self._get_config().loot_history, int_list
         )
-        output_result_list = output_result_list[pagination:]
 
         BotLogger().get().debug("Output Result List: %s", output_result_list)
-        if len(output_result_list) > 0:
-            data = self._build_player_loot_output_multiple(output_result_list)
-        else:
+        data = self._build_player_loot_output_multiple(output_result_list, page)
+        if not data:
             data = BasicError(
                 "{0}'s loot was not found in database.".format(param.capitalize())
             ).get()
@@ -774,15 +975,13 @@ class EssentialDKPBot(DKPBot):
 
         _, _, _, int_list = self._parse_player_param(param)
 
-        pagination = type(self)._calculate_pagination(
+        page = type(self)._calculate_pagination(
             self._get_config().latest_loot, int_list
         )
-        output_result_list = output_result_list[pagination:]
 
         BotLogger().get().debug("Output Result List: %s", output_result_list)
-        if len(output_result_list) > 0:
-            data = self._build_loot_output_multiple(output_result_list)
-        else:
+        data = self._build_loot_output_multiple(output_result_list, page)
+        if not data:
             data = BasicError("Unable to find loot data.").get()
 
         return Response(ResponseStatus.SUCCESS, data)
@@ -831,20 +1030,9 @@ class EssentialDKPBot(DKPBot):
                 BasicError("Query too short. Please specify at least 3 letters.").get(),
             )
 
-        output_result_list_intermediate = self._find_loot(
+        output_result_list = self._find_item_values(
             param, self._get_channel_team_mapping(request_info["channel"]["id"])
         )
-        BotLogger().get().debug(
-            "Output Result List Intermediate: %s", output_result_list_intermediate
-        )
-
-        output_result_list = []
-        if len(output_result_list_intermediate) > 0:
-            value = Statistics()
-            for item in output_result_list_intermediate:
-                value.data[(item.item_id(), item.item_name())] = item.dkp()
-            for (_id, _name), _value in value.data.items():
-                output_result_list.append((_id, _name, _value))
 
         BotLogger().get().debug("Output Result List: %s", output_result_list)
         if len(output_result_list) > 0:
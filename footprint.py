@@ -23,6 +23,20 @@ except ImportError:
     pass
 
 
+def _slot_names(cls):
+    # Slots of the whole hierarchy, private ones under their mangled name
+    names = []
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name.startswith("__") and not name.endswith("__"):
+                name = "_{0}{1}".format(klass.__name__.lstrip("_"), name)
+            names.append(name)
+    return names
+
+
 def total_size(o, handlers={}, verbose=False):
     """Returns the approximate memory footprint an object and all of its contents.
 
@@ -70,7 +84,7 @@ def total_size(o, handlers={}, verbose=False):
                 else:
                     s += sum(
                         sizeof(getattr(o, x))
-                        for x in o.__class__.__slots__
+                        for x in _slot_names(o.__class__)
                         if hasattr(o, x)
                     )
         return s
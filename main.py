@@ -0,0 +1,24 @@
+# Copyright 2020-2023 Lantis
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Side effect free entry module. Spawned build workers import it as their
+# __main__ (see core.set_spawn_entry), so nothing but the guarded block below
+# may set up the Discord client.
+
+import sys
+
+if __name__ == "__main__":
+    import core
+
+    core.run(sys.argv)
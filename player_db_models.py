@@ -12,23 +12,49 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import time
+from sys import intern
 import player_role
 from player_role import Role
-from bot_logger import trace, trace_func_only, for_all_methods
 from bot_utility import get_width
 
-@for_all_methods(trace, trace_func_only)
+# Databases hold hundreds of thousands of these. They use slots and are not
+# traced: accessors are called for every entry while building and sorting.
+# Names, classes, items, reasons and officers repeat across entries and are
+# interned so each distinct value is stored (and pickled) once.
+
+# Activity is kept as a [start, end] window of timestamps and checked against
+# a clock advancing in hourly steps, so it stays correct between uploads.
+ACTIVITY_RESOLUTION = 3600
+_ALWAYS_ACTIVE = (float("-inf"), float("inf"))
+_NEVER_ACTIVE = (float("inf"), float("-inf"))
+# Roles are shared, see player_role.get
+_ANY_ROLE = Role(True, True, True, True, True, 0)
+
+
+def activity_clock():
+    return int(time.time()) // ACTIVITY_RESOLUTION * ACTIVITY_RESOLUTION
+
+
 class PlayerInfoBasic:
+    __slots__ = (
+        "_player",
+        "_ingame_class",
+        "_smart_role",
+        "_active",
+        "_latest_loot_entry",
+    )
+
     def __init__(
         self, player, ingame_class, role, spec
     ):
-        self._player = str(player).lower().capitalize()
-        self._ingame_class = str(ingame_class).lower().capitalize()
+        self._player = intern(str(player).lower().capitalize())
+        self._ingame_class = intern(str(ingame_class).lower().capitalize())
         if ingame_class is None or spec is None:
-            self._smart_role = Role(True, True, True, True, True, 0)
+            self._smart_role = _ANY_ROLE
         else:
             self._smart_role = player_role.get(ingame_class, spec)
-        self._active = True
+        self._active = _ALWAYS_ACTIVE
         self._latest_loot_entry = None
 
     def name(self):
@@ -44,13 +70,18 @@ class PlayerInfoBasic:
         return self._smart_role
 
     def set_inactive(self):
-        self._active = False
+        self._active = _NEVER_ACTIVE
 
     def set_active(self):
-        self._active = True
+        self._active = _ALWAYS_ACTIVE
+
+    def set_active_between(self, start, end):
+        self._active = (start, end)
 
-    def is_active(self):
-        return self._active
+    def is_active(self, now=None):
+        if now is None:
+            now = activity_clock()
+        return self._active[0] <= now <= self._active[1]
 
     def set_latest_loot_entry(self, loot_entry):
         if loot_entry and isinstance(loot_entry, list):
@@ -63,7 +94,7 @@ class PlayerInfoBasic:
         return "{0} {1} {3} | Active: {2}".format(
             self._player,
             self._ingame_class,
-            self._active,
+            self.is_active(),
             self._smart_role,
         )
 
@@ -72,8 +103,17 @@ class PlayerInfoBasic:
     def __hash__(self):
         return hash(str(self))
 
-@for_all_methods(trace, trace_func_only)
 class PlayerInfo(PlayerInfoBasic):
+    __slots__ = (
+        "_dkp",
+        "_lifetime_gained",
+        "_lifetime_spent",
+        "_latest_history_entry",
+        "_alts",
+        "_altCount",
+        "_main",
+    )
+
     def __init__(
         self, player, dkp, lifetime_gained, lifetime_spent, ingame_class, role, spec
     ):
@@ -132,7 +172,7 @@ class PlayerInfo(PlayerInfoBasic):
         return self._latest_history_entry
 
     def width(self):
-        return get_width(self.dkp())
+        return get_width(self._dkp)
 
     def __str__(self):
         return "{0} ({1} - {6}) {2} ({3}/{4}) DKP | Active: {5}".format(
@@ -141,7 +181,7 @@ class PlayerInfo(PlayerInfoBasic):
             self._dkp,
             self._lifetime_gained,
             self._lifetime_spent,
-            self._active,
+            self.is_active(),
             self._smart_role,
         )
 
@@ -154,57 +194,58 @@ class PlayerInfo(PlayerInfoBasic):
 
     def __eq__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() == other
+            other = other._dkp
+        return self._dkp == other
 
     def __neq__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() != other
+            other = other._dkp
+        return self._dkp != other
 
     def __lt__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() < other
+            other = other._dkp
+        return self._dkp < other
 
     def __le__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() <= other
+            other = other._dkp
+        return self._dkp <= other
 
     def __gt__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() > other
+            other = other._dkp
+        return self._dkp > other
 
     def __ge__(self, other):
         if isinstance(other, PlayerInfo):
-            other = other.dkp()
-        return self.dkp() >= other
+            other = other._dkp
+        return self._dkp >= other
 
 
-@for_all_methods(trace, trace_func_only)
 class PlayerInfoEPGP(PlayerInfo):
+    __slots__ = ()
+
     def __init__(self, player, ep, gp):
         super().__init__(player, ep, gp, 0 if gp == 0 else ep / gp, None, None, None)
 
     def ep(self):
-        return self.dkp()
+        return self._dkp
 
     def gp(self):
-        return self.lifetime_gained()
+        return self._lifetime_gained
 
     def pr(self):
-        return self.lifetime_spent()
+        return self._lifetime_spent
 
     def ep_width(self):
-        return get_width(self.ep())
+        return get_width(self._dkp)
 
     def gp_width(self):
-        return get_width(self.gp())
+        return get_width(self._lifetime_gained)
 
     def pr_width(self):
-        return get_width(self.pr())
+        return get_width(self._lifetime_spent)
 
     def set_latest_loot_entry(self, loot_entry):
         if loot_entry and isinstance(loot_entry, PlayerLootEPGP):
@@ -243,8 +284,9 @@ class PlayerInfoEPGP(PlayerInfo):
             )
 
 
-@for_all_methods(trace, trace_func_only)
 class PlayerLootBasic:
+    __slots__ = ("_player", "_item_id", "_item_name", "_timestamp")
+
     def __init__(self, player, item_id, item_name, timestamp):
         if not isinstance(
             player, (PlayerInfo, PlayerInfoEPGP, PlayerInfoBasic)
@@ -252,7 +294,7 @@ class PlayerLootBasic:
             player = PlayerInfo(str(player), 0, -1, -1, "UNKNOWN", "UNKNOWN", None)
         self._player = player
         self._item_id = int(item_id)
-        self._item_name = str(item_name)
+        self._item_name = intern(str(item_name))
         self._timestamp = int(timestamp)
 
     def player(self):
@@ -268,7 +310,7 @@ class PlayerLootBasic:
         return self._timestamp
 
     def width(self):
-        return get_width(self.dkp())
+        return get_width(self._dkp)
 
     def __str__(self):
         return "{0}: {1} {2}({3})".format(
@@ -283,8 +325,9 @@ class PlayerLootBasic:
     def __hash__(self):
         return hash(str(self))
 
-@for_all_methods(trace, trace_func_only)
 class PlayerLoot(PlayerLootBasic):
+    __slots__ = ("_dkp",)
+
     def __init__(self, player, item_id, item_name, dkp, timestamp):
         super().__init__(player, item_id, item_name, timestamp)
 
@@ -308,10 +351,11 @@ class PlayerLoot(PlayerLootBasic):
         return hash(str(self))
 
 
-@for_all_methods(trace, trace_func_only)
 class PlayerLootEPGP(PlayerLoot):
+    __slots__ = ()
+
     def gp(self):
-        return self.dkp()
+        return self._dkp
 
     def __str__(self):
         return "{0}: {1} {2}({3}) for {4} GP".format(
@@ -323,20 +367,108 @@ class PlayerLootEPGP(PlayerLoot):
         )
 
 
-# @for_all_methods(trace, trace_func_only)
+class ItemValue:
+    """Cost statistics of an item over its loot entries. Costs are DKP or,
+    for EPGP loot, GP."""
+
+    __slots__ = (
+        "_item_id",
+        "_item_name",
+        "_first",
+        "_costs",
+        "total",
+        "min",
+        "max",
+        "avg",
+        "num",
+    )
+
+    def __init__(self, item_id, item_name, first, costs):
+        self._item_id = item_id
+        self._item_name = item_name
+        # Position of the most recent loot entry, items are listed by it
+        self._first = first
+        self._costs = sorted(costs)
+        self.total = sum(self._costs)
+        self.num = len(self._costs)
+        self.min = self._costs[0]
+        self.max = self._costs[-1]
+        self.avg = self.total / self.num
+
+    def item_id(self):
+        return self._item_id
+
+    def item_name(self):
+        return self._item_name
+
+    def first(self):
+        return self._first
+
+    def costs(self):
+        return self._costs
+
+    # Nearest-rank percentile, 0 < percent <= 100
+    def percentile(self, percent):
+        rank = -(-percent * self.num // 100)
+        return self._costs[max(0, min(self.num, int(rank)) - 1)]
+
+    def __str__(self):
+        return "Min: {0} Max: {1} Avg: {2} Num: {3}".format(
+            self.min, self.max, self.avg, self.num
+        )
+
+    __repr__ = __str__
+
+
+class AwardEvent:
+    """Award shared by all the players it was given to"""
+
+    __slots__ = ("_timestamp", "_reason", "_officer", "_percentage")
+
+    def __init__(self, timestamp, reason, index, percentage=False):
+        self._timestamp = int(timestamp)
+        self._reason = intern(str(reason))
+        officer = str(index.split("-")[0])
+        self._officer = intern(officer.lower().capitalize())
+        self._percentage = bool(percentage)
+
+    def timestamp(self):
+        return self._timestamp
+
+    def reason(self):
+        return self._reason
+
+    def officer(self):
+        return self._officer
+
+    def percentage(self):
+        return self._percentage
+
+
 class PlayerDKPHistory:
+    # Timestamp is also kept here as entries are sorted by it
+    __slots__ = ("_player", "_dkp", "_timestamp", "_event")
+
     def __init__(self, player, dkp, timestamp, reason, index, percentage=False):
+        self._set_event(
+            player, dkp, AwardEvent(timestamp, reason, index, percentage)
+        )
+
+    @classmethod
+    def from_event(cls, player, dkp, event):
+        history = cls.__new__(cls)
+        history._set_event(player, dkp, event)
+        return history
+
+    def _set_event(self, player, dkp, event):
         if not isinstance(
             player, (PlayerInfo, PlayerInfoEPGP)
         ):  # Workaround as we expect player to be connected to the Player DKP
             player = PlayerInfo(str(player), 0, -1, -1, "UNKNOWN", "UNKNOWN", None)
         self._player = player
         self._dkp = float(dkp)
-        self._percentage = bool(percentage)
-        self._timestamp = int(timestamp)
-        self._reason = str(reason)
-        officer = str(index.split("-")[0])
-        self._officer = officer.lower().capitalize()
+        self._timestamp = event._timestamp
+        self._event = event
 
     def player(self):
         return self._player
@@ -347,24 +479,31 @@ class PlayerDKPHistory:
     def timestamp(self):
         return self._timestamp
 
+    def event(self):
+        return self._event
+
     def reason(self):
-        return self._reason
+        return self._event._reason
 
     def officer(self):
-        return self._officer
+        return self._event._officer
 
     def width(self):
         offset = 0
-        if self._percentage:
+        if self._event._percentage:
             offset = 1
-        return get_width(self.dkp()) + offset
+        return get_width(self._dkp) + offset
 
     def percentage(self):
-        return self._percentage
+        return self._event._percentage
 
     def __str__(self):
         return "{0}: {1} {2} DKP ({3}) by {4}".format(
-            self._timestamp, self._player.name(), self._dkp, self._reason, self._officer
+            self._timestamp,
+            self._player.name(),
+            self._dkp,
+            self._event._reason,
+            self._event._officer,
         )
 
     __repr__ = __str__
@@ -405,24 +544,25 @@ class PlayerDKPHistory:
     #     return self.dkp() >= other
 
 
-@for_all_methods(trace, trace_func_only)
 class PlayerEPGPHistory(PlayerDKPHistory):
+    __slots__ = ("_gp", "_is_percentage")
+
     def __init__(self, player, ep, gp, is_percentage, timestamp, reason, officer):
         super().__init__(player, ep, timestamp, reason, officer)
         self._gp = float(gp)
         self._is_percentage = bool(is_percentage)
 
     def ep(self):
-        return self.dkp()
+        return self._dkp
 
     def gp(self):
         return self._gp
 
     def ep_width(self):
-        return get_width(self.ep())
+        return get_width(self._dkp)
 
     def gp_width(self):
-        return get_width(self.gp())
+        return get_width(self._gp)
 
     def is_percentage(self):
         return is_percentage
@@ -433,22 +573,23 @@ class PlayerEPGPHistory(PlayerDKPHistory):
             self._player.name(),
             self._dkp,
             self._gp,
-            self._reason,
-            self._officer,
+            self._event._reason,
+            self._event._officer,
         )
 
-@for_all_methods(trace, trace_func_only)
 class PlayerInfoCLM(PlayerInfo):
+    __slots__ = ()
+
     def __init__(self, player, dkp, ingame_class, spec):
         super().__init__(player, dkp, 0, 0, ingame_class, None, spec)
 
         if ingame_class is None or spec is None:
-            self._smart_role = Role(True, True, True, True, True, 0)
+            self._smart_role = _ANY_ROLE
         else:
             self._smart_role = player_role.get(ingame_class, spec)
 
     def width(self):
-        return get_width(self.dkp())
+        return get_width(self._dkp)
 
     def set_latest_loot_entry(self, loot_entry):
         if loot_entry and isinstance(loot_entry, PlayerLoot):
@@ -463,6 +604,6 @@ class PlayerInfoCLM(PlayerInfo):
             self._player,
             self._ingame_class,
             self._dkp,
-            self._active,
+            self.is_active(),
             self._smart_role,
         )
@@ -13,15 +13,11 @@
 # limitations under the License.
 
 import re
+import functools
 
 # TODO update for WoTLK
 class Role:
-    __tank = False
-    __dps = True  # So we won't filter at least in single group?
-    __healer = False
-    __ranged = False
-    __caster = False
-    __spec_id = -1
+    __slots__ = ("__tank", "__dps", "__healer", "__ranged", "__caster", "__spec_id")
 
     def __init__(
         self,
@@ -32,18 +28,13 @@ class Role:
         caster: bool,
         spec_id: int = -1,
     ):
-        if isinstance(tank, bool):
-            self.__tank = tank
-        if isinstance(dps, bool):
-            self.__dps = dps
-        if isinstance(healer, bool):
-            self.__healer = healer
-        if isinstance(ranged, bool):
-            self.__ranged = ranged
-        if isinstance(caster, bool):
-            self.__caster = caster
-        if spec_id in [0, 1, 2]:
-            self.__spec_id = spec_id
+        self.__tank = tank if isinstance(tank, bool) else False
+        # So we won't filter at least in single group?
+        self.__dps = dps if isinstance(dps, bool) else True
+        self.__healer = healer if isinstance(healer, bool) else False
+        self.__ranged = ranged if isinstance(ranged, bool) else False
+        self.__caster = caster if isinstance(caster, bool) else False
+        self.__spec_id = spec_id if spec_id in [0, 1, 2] else -1
 
     def is_tank(self):
         return self.__tank
@@ -94,26 +85,37 @@ class Role:
 __role_re = re.compile("^.*?\(*(\d+)\/(\d+)\/(\d+)\)*.*")
 
 
+# Roles are never modified, so every player with the same outcome shares one
+__roles = {}
+
+
+def __shared(*args):
+    role = __roles.get(args)
+    if role is None:
+        role = __roles.setdefault(args, Role(*args))
+    return role
+
+
 def __get(class_name: str, talents: list):
     class_name = class_name.lower()
 
     if class_name in ["mage", "warlock"]:
-        return Role(False, True, False, True, True, 0)
+        return __shared(False, True, False, True, True, 0)
 
     if class_name == "rogue":
-        return Role(False, True, False, False, False, 0)
+        return __shared(False, True, False, False, False, 0)
 
     if class_name == "hunter":
-        return Role(False, True, False, True, False, 0)
+        return __shared(False, True, False, True, False, 0)
 
     # Warrior
     # (a/b/1+) - tank
     # everything else: dps
     if class_name == "warrior":
         if talents[2] > 0:
-            return Role(True, False, False, False, False, 2)
+            return __shared(True, False, False, False, False, 2)
         else:
-            return Role(False, True, False, False, False, 0)
+            return __shared(False, True, False, False, False, 0)
 
     # Druid:
     # (30+/a/b) - dps
@@ -122,21 +124,21 @@ def __get(class_name: str, talents: list):
     # everything else: dps and tank
     if class_name == "druid":
         if talents[0] >= 30:
-            return Role(False, True, False, True, True, 0)
+            return __shared(False, True, False, True, True, 0)
         elif talents[1] >= 21:
-            return Role(True, True, False, False, False, 1)
+            return __shared(True, True, False, False, False, 1)
         elif talents[2] >= 21:
-            return Role(False, False, True, True, True, 2)
+            return __shared(False, False, True, True, True, 2)
         else:
-            return Role(True, True, False, False, False)
+            return __shared(True, True, False, False, False)
     # Priest
     # (a/b/30+) - dps
     # everything else healer
     if class_name == "priest":
         if talents[2] >= 30:
-            return Role(False, True, False, True, True, 2)
+            return __shared(False, True, False, True, True, 2)
         else:
-            return Role(False, False, True, True, True, 0)
+            return __shared(False, False, True, True, True, 0)
 
     # Paladin:
     # (20+/a/b) - holy
@@ -145,13 +147,13 @@ def __get(class_name: str, talents: list):
     # everything else: holy
     if class_name == "paladin":
         if talents[0] >= 20:
-            return Role(False, False, True, True, True, 0)
+            return __shared(False, False, True, True, True, 0)
         elif talents[2] >= 25:
-            return Role(False, True, False, False, False, 2)
+            return __shared(False, True, False, False, False, 2)
         elif talents[1] >= 31:
-            return Role(True, False, False, False, False, 1)
+            return __shared(True, False, False, False, False, 1)
         else:
-            return Role(True, True, True, True, True)
+            return __shared(True, True, True, True, True)
 
     # Shaman:
     # (31+/a/b) - dps ranged
@@ -160,17 +162,18 @@ def __get(class_name: str, talents: list):
     # everything else: dps and heal
     if class_name == "shaman":
         if talents[0] >= 31:
-            return Role(False, True, False, True, True, 0)
+            return __shared(False, True, False, True, True, 0)
         elif talents[1] >= 31:
-            return Role(False, True, False, False, False, 1)
+            return __shared(False, True, False, False, False, 1)
         elif talents[2] >= 30:
-            return Role(False, False, True, True, True, 2)
+            return __shared(False, False, True, True, True, 2)
         else:
-            return Role(False, True, True, True, True)
+            return __shared(False, True, True, True, True)
 
-    return Role(False, False, False, False, False)
+    return __shared(False, False, False, False, False)
 
 
+@functools.lru_cache(maxsize=4096)
 def get(class_name: str, role_string: str):
     talents = [0, 0, 0]
     match = __role_re.match(role_string)
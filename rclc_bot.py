@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import re
+import operator
 from enum import Enum
 from dkp_bot import DKPBot, Response, ResponseStatus
 from essentialdkp_bot import EssentialDKPBot
@@ -164,6 +165,13 @@ class RCLCBot(EssentialDKPBot):
 
     ### Database - Variables parsing ###
 
+    # There is no DKP in RCLC, players are listed by name
+    def _get_standings_order(self):
+        return (operator.attrgetter("_player"), False)
+
+    def _get_saved_variables_names(self):
+        return [self._SV]
+
     # Called 1st
     def _build_config_database(self, saved_variable):  # pylint: disable=unused-argument
         self._set_addon_config({})
@@ -260,7 +268,7 @@ class RCLCBot(EssentialDKPBot):
 
         output_result_list = []
         if "all" in original:
-            output_result_list = self._get_team_dkp(self.DEFAULT_TEAM)
+            output_result_list = self._get_team_standings(self.DEFAULT_TEAM)
         else:
             if len(targets) == len(int_list) and raid_helper_filter:
                 output_result_list = self._get_dkp_target_results(
@@ -268,7 +276,7 @@ class RCLCBot(EssentialDKPBot):
                 )
             elif len(targets) > 0:
                 output_result_list = self._get_dkp_target_results(
-                    self.DEFAULT_TEAM, targets, original, None
+                    self.DEFAULT_TEAM, targets, original, None, True
                 )
                 if self.is_premium() and raid_helper_filter:
                     output_result_list = list(
@@ -287,7 +295,9 @@ class RCLCBot(EssentialDKPBot):
         if len(output_result_list) == 1:
             data = self._build_dkp_output_single(output_result_list[0])
         elif len(output_result_list) > 0:
-            output_result_list.sort(key=lambda info: info.name(), reverse=False)
+            output_result_list = self._order_by_standings(
+                output_result_list, self.DEFAULT_TEAM
+            )
             data = self._build_dkp_output_multiple(
                 output_result_list, request_info["author"]["name"]
             )
@@ -348,7 +358,7 @@ class RCLCBot(EssentialDKPBot):
         help_string += "Display latest loot for specified `player`.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "loot player", "")
         )
-        help_string += "Display N-th loot page for specified `player`.\n{0}\n".format(
+        help_string += "Display N-th loot page for specified `player`. Each page is a single message, independent of the `messages` display setting. First page is 0.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "loot player N", "")
         )
         return Response(
@@ -360,7 +370,7 @@ class RCLCBot(EssentialDKPBot):
             preformatted_block(self.get_prefix() + "raidloot", "")
             + preformatted_block("Supporter only command", "css")
         )
-        help_string += "Display N-th page of loot entries from raids.\n{0}\n".format(
+        help_string += "Display N-th page of loot entries from raids. Each page is a single message, independent of the `messages` display setting. First page is 0.\n{0}\n".format(
             preformatted_block(self.get_prefix() + "raidloot N", "")
             + preformatted_block("Supporter only command", "css")
         )
@@ -13,6 +13,7 @@
 # limitations under the License.
 
 import re
+import json
 import six
 from slpp import SLPP
 from bot_logger import BotLogger
@@ -38,27 +39,388 @@ class WowLuaParser(SLPP):
 wlp = WowLuaParser()
 
 
-class SavedVariablesParser:
-    def parse_string(self, input_string):
-        strings = input_string.split("}\r\n")  # split variables
-        if not isinstance(strings, list):
-            BotLogger().get().error("Something not ok with split")
+class WowLuaScanner:
+    # Whitespace, comments and key brackets are consumed as a prefix of every
+    # token so the decoding loop only ever sees meaningful tokens. The most
+    # common SavedVariables line, ["key"] = scalar, is matched as one token.
+    __token_re = re.compile(
+        r"""(?:\s|--[^\n]*(?![^\n])|[\[\]])*(?:"""
+        r""""([^"\\]*)"\]\s*=\s*(?:"""  # 1 key of a keyed scalar entry
+        r""""([^"\\]*(?:\\.[^"\\]*)*)"""  # 2 string value
+        r""""|(-?\d+(?:\.\d+)?)(?![\w.])"""  # 3 number value
+        r"""|(true|false|nil)\b"""  # 4 word value
+        r""")\s*[,;]"""
+        r"""|"([^"\\]*(?:\\.[^"\\]*)*)\""""  # 5 double quoted string
+        r"""|(=)"""  # 6 assignment
+        r"""|([,;])"""  # 7 separator
+        r"""|(-?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]\d+)?))"""  # 8 number
+        r"""|(\{)"""  # 9 table open
+        r"""|(\})"""  # 10 table close
+        r"""|([A-Za-z_]\w*)"""  # 11 word
+        r"""|'([^'\\]*(?:\\.[^'\\]*)*)'"""  # 12 single quoted string
+        r""")""",
+        re.S,
+    )
+
+    # Jumps from brace to brace, strings and comments included
+    __skip_re = re.compile(
+        r"""[^{}"'\-]*(?:(?:"""
+        r""""[^"\\]*(?:\\.[^"\\]*)*\""""
+        r"""|'[^'\\]*(?:\\.[^'\\]*)*'"""
+        r"""|--[^\n]*(?![^\n])"""
+        r"""|-(?!-)"""
+        r""")[^{}"'\-]*)*([{}])"""
+    )
+
+    __words = {"true": True, "false": False, "nil": None}
+
+    @staticmethod
+    def __number(string):
+        try:
+            return int(string, 0)
+        except ValueError:
+            return float(string)
+
+    @staticmethod
+    def __finalize(table, keyed):
+        # Positional Lua arrays come back as lists the same way SLPP returns
+        # them. Empty tables stay dicts.
+        if not keyed:
+            return table if len(table) > 0 else {}
+        for key in table:
+            if type(key) is not int:
+                return table
+        length = len(table)
+        for key in range(length):
+            if key not in table:
+                return table
+        return [table[key] for key in range(length)]
+
+    def skip(self, text, pos=0, endpos=None):
+        # Returns the end of the value at pos without building it
+        if endpos is None:
+            endpos = len(text)
+
+        match = self.__skip_re.scanner(text, pos, endpos).match
+        token = match()
+        if token is None or token.group(1) != "{" or token.start(1) != pos:
+            return self.scan(text, pos, endpos)[1]
+
+        depth = 1
+        while depth > 0:
+            token = match()
+            if token is None:
+                raise ValueError("Unexpected end of table while parsing Lua string.")
+            if token.group(1) == "{":
+                depth += 1
+            else:
+                depth -= 1
+        return token.end()
+
+    def decode(self, text, pos=0, endpos=None):
+        return self.scan(text, pos, endpos)[0]
+
+    def scan(self, text, pos=0, endpos=None):
+        # Returns the value at pos and the offset right after it
+        if not text or not isinstance(text, str):
+            return (None, pos)
+
+        if endpos is None:
+            endpos = len(text)
+
+        match = self.__token_re.scanner(text, pos, endpos).match
+        words = self.__words
+        number = self.__number
+        finalize = self.__finalize
+
+        none = object()  # marks an empty key / pending slot
+        stack = []
+        table = None
+        keyed = False
+        key = none
+        pending = none
+
+        while True:
+            token = match()
+            if token is None:
+                if table is None:
+                    return (None, endpos)
+                raise ValueError("Unexpected end of table while parsing Lua string.")
+
+            kind = token.lastindex
+
+            if kind <= 4:
+                if not keyed:
+                    table = dict(enumerate(table))
+                    keyed = True
+                if kind == 2:
+                    value = token.group(2)
+                    if "\\" in value:
+                        value = value.replace('\\"', '"')
+                elif kind == 3:
+                    value = number(token.group(3))
+                else:
+                    value = words[token.group(4)]
+                table[token.group(1)] = value
+                continue
+            elif kind == 5:
+                value = token.group(5)
+                if "\\" in value:
+                    value = value.replace('\\"', '"')
+            elif kind == 6:
+                key = pending
+                pending = none
+                if not keyed:
+                    table = dict(enumerate(table))
+                    keyed = True
+                continue
+            elif kind == 7:
+                if pending is not none:
+                    if keyed:
+                        table[len(table)] = pending
+                    else:
+                        table.append(pending)
+                    pending = none
+                continue
+            elif kind == 8:
+                value = number(token.group(8))
+            elif kind == 9:
+                stack.append((table, keyed, key, pending))
+                table = []
+                keyed = False
+                key = none
+                pending = none
+                continue
+            elif kind == 10:
+                if len(stack) == 0:
+                    raise ValueError("Unexpected table close while parsing Lua string.")
+                if pending is not none and pending is not None:
+                    if keyed:
+                        table[len(table)] = pending
+                    else:
+                        table.append(pending)
+                value = finalize(table, keyed)
+                (table, keyed, key, pending) = stack.pop()
+                if table is None:
+                    return (value, token.end())
+                # Nested tables are never keys so store them right away
+                if key is not none:
+                    table[key] = value
+                    key = none
+                elif keyed:
+                    table[len(table)] = value
+                else:
+                    table.append(value)
+                continue
+            elif kind == 11:
+                value = token.group(11)
+                value = words.get(value, value)
+            else:
+                value = token.group(12)
+                if "\\" in value:
+                    value = value.replace("\\'", "'")
+
+            if table is None:
+                return (value, token.end())
+
+            if key is not none:
+                table[key] = value
+                key = none
+            else:
+                pending = value
+
+
+wls = WowLuaScanner()
+
+
+class WowLuaJsonTranspiler:
+    # Rewrites SavedVariables as WoW writes them (one entry per line, string
+    # keys in brackets, `-- [n]` array comments) into JSON text and leaves
+    # object creation to json. Without backslashes a line break can never be
+    # inside a string, so every rewrite is anchored on line structure. Any
+    # other Lua ends up as invalid JSON and raises ValueError so the caller
+    # can fall back to the scanner.
+    __comment_re = re.compile(r", -- \[\d+\](?=\r?\n)")
+    __trailing_re = re.compile(r",(?=\r?\n\t*\})")
+    # Table opens are moved to the start of the next line so that opens and
+    # closes can be found by searching for line breaks only
+    __table_re = re.compile(
+        r"""\n(?:\{(?=\t*(\[))"""  # 1 keyed table open
+        r"""|\{(?=\t*(\}))"""  # 2 empty table open, its close is left as is
+        r"""|(\{)"""  # 3 array table open
+        r"""|\t*(\}))"""  # 4 table close
+    )
+    __string_key_re = re.compile(r'\n\t*\["')
+    __first_string_key_re = re.compile(r'\n\{\t*\["')
+    __number_key_re = re.compile(r"(\n\{?)\t*\[(-?\d+)\] = ")
+    __nil_re = re.compile(r"(\n\[?\t*|\": )nil\b")
+
+    __number_key_mark = "\x00"
+
+    def __init__(self):
+        # NaN and Infinity are JSON extensions Lua never writes
+        self.__decoder = json.JSONDecoder(
+            strict=False, parse_constant=self.__unsupported
+        )
+        self.__number_keys_decoder = json.JSONDecoder(
+            strict=False,
+            parse_constant=self.__unsupported,
+            object_pairs_hook=self.__object_pairs,
+        )
+
+    @staticmethod
+    def __unsupported(string):
+        raise ValueError("Unsupported Lua construct: {0}".format(string))
+
+    @classmethod
+    def __object_pairs(cls, pairs):
+        # Same rules as WowLuaScanner.__finalize for numeric keys
+        mark = cls.__number_key_mark
+        table = {}
+        for key, value in pairs:
+            if key[:1] == mark:
+                key = int(key[1:])
+            table[key] = value
+        length = len(table)
+        if length == 0:
+            return table
+        for key in range(length):
+            if key not in table:
+                return table
+        return [table[key] for key in range(length)]
+
+    def transpile(self, text, pos=0, endpos=None):
+        if endpos is None:
+            endpos = len(text)
+
+        text = text[pos:endpos]
+        if "\\" in text:
+            self.__unsupported("\\")
+
+        stack = []
+
+        def table(token):
+            kind = token.lastindex
+            if kind == 1:
+                stack.append("}")
+                return "\n{"
+            elif kind == 2:
+                return "\n{"
+            elif kind == 3:
+                stack.append("]")
+                return "\n["
+            if len(stack) == 0:
+                self.__unsupported("}")
+            return "\n" + stack.pop()
+
+        text = self.__comment_re.sub(",", text)
+        text = self.__trailing_re.sub("", text)
+        text = text.replace("{\r\n", "\r\n{").replace("{\n", "\n{")
+        text = self.__table_re.sub(table, text)
+        text = self.__string_key_re.sub('\n"', text)
+        text = self.__first_string_key_re.sub('\n{"', text)
+        text = text.replace('"] = ', '": ')
+        (text, number_keys) = self.__number_key_re.subn(
+            '\\1"\\\\u0000\\2": ', text
+        )
+        if "nil" in text:
+            text = self.__nil_re.sub("\\1null", text)
+        return (text, number_keys > 0)
+
+    def decode(self, text, pos=0, endpos=None):
+        if not text or not isinstance(text, str):
             return None
-        pattern = re.compile(
-            "^\s*([a-zA-Z0-9-_]*)\s*=\s*"
-        )  # pylint: disable=anomalous-backslash-in-string
+
+        (string, number_keys) = self.transpile(text, pos, endpos)
+        string = string.lstrip()
+        if len(string) == 0:
+            return None
+
+        if number_keys:
+            decoder = self.__number_keys_decoder
+        else:
+            decoder = self.__decoder
+
+        # The value has to fill the whole text, extra data raises ValueError
+        return decoder.decode(string)
+
+
+wljt = WowLuaJsonTranspiler()
+
+
+class SavedVariablesParser:
+    ENGINE_SCANNER = "scanner"
+    ENGINE_JSON = "json"
+    ENGINES = [ENGINE_SCANNER, ENGINE_JSON]
+
+    __default_engine = ENGINE_SCANNER
+
+    @classmethod
+    def set_default_engine(cls, engine):
+        if engine not in cls.ENGINES:
+            raise ValueError("Unknown SavedVariables engine: {0}".format(engine))
+        cls.__default_engine = engine
+
+    def __init__(self, engine=None):
+        if engine is None:
+            engine = self.__default_engine
+        elif engine not in self.ENGINES:
+            raise ValueError("Unknown SavedVariables engine: {0}".format(engine))
+        self.__engine = engine
+
+    # A top-level `Name = ` assignment, leading comments included
+    __assignment_re = re.compile(
+        r"(?:\s|--[^\n]*(?![^\n]))*([A-Za-z0-9_-]+)\s*=\s*"
+    )
+    __end_re = re.compile(r"(?:\s|--[^\n]*(?![^\n])|;)*")
+
+    def __decode(self, name, text, pos):
+        if self.__engine == self.ENGINE_JSON and text.startswith("{", pos):
+            # WoW closes top-level tables at the start of a line. If that
+            # guess is wrong the text is not valid JSON.
+            end = text.find("\n}", pos)
+            if end >= 0:
+                end += 2
+                try:
+                    return (wljt.decode(text, pos, end), end)
+                except ValueError as exception:
+                    BotLogger().get().info(
+                        "JSON engine fallback for %s: %s", name, exception
+                    )
+        return wls.scan(text, pos)
+
+    def parse_string(self, input_string, variables=None):
+        # `variables` limits decoding to the listed top-level names. Others are
+        # skipped by matching braces without building any objects for them.
+        if variables is not None:
+            variables = set(variables)
         saved_variables = {}
-        for string in strings:
-            if len(string) == 0:
-                continue
-            string += "}"
-            out = pattern.match(string)
-            saved_variables[out.group().replace(" = ", "").strip()] = wlp.decode(
-                pattern.sub("", string, 1)
-            )
+        length = len(input_string)
+        pos = self.__end_re.match(input_string).end()
+        while pos < length:
+            out = self.__assignment_re.match(input_string, pos)
+            if out is None:
+                BotLogger().get().error(
+                    "Unexpected SavedVariables content at %d", pos
+                )
+                break
+            name = out.group(1)
+            pos = out.end()
+            if variables is not None and name not in variables:
+                # Unused variables can not fail the upload, keep what was read
+                try:
+                    pos = wls.skip(input_string, pos)
+                except ValueError as exception:
+                    BotLogger().get().warning(
+                        "Skipping %s at %d stopped parsing: %s", name, pos, exception
+                    )
+                    break
+            else:
+                (saved_variables[name], pos) = self.__decode(name, input_string, pos)
+            pos = self.__end_re.match(input_string, pos).end()
         return saved_variables
 
-    def parse_file(self, filepath):
+    def parse_file(self, filepath, variables=None):
         with open(filepath) as file:
-            return self.parse_string(file.read())
+            return self.parse_string(file.read(), variables)
         return None
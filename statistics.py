@@ -118,10 +118,12 @@ class Statistics:
 
     database = None
     data = None
+    build = None
 
     def __init__(self):
         self.database = {}
         self.data = Statistics.Data()
+        self.build = Statistics.Data()
 
     @staticmethod
     def format_list(data, indent=0):
@@ -186,8 +188,22 @@ class Statistics:
             string += "```"
         return string
 
+    def print_build(self):
+        string = ""
+        string += "```asciidoc\n=== Build ===```"
+        if len(self.build) > 0:
+            string += "```c\n"
+            string += Statistics.format(self.build.get(), -2)
+            string += "```"
+        else:
+            string += "```asciidoc\n"
+            string += "[ none ]"
+            string += "```"
+        return string
+
     def __str__(self):
         string = ""
         string += self.print_database()
         string += self.print_data()
+        string += self.print_build()
         return string
@@ -86,6 +86,9 @@ class Superuser:
                     response_list.append(
                         self.__bots[bot_id].statistics.print_database()
                     )
+                    response_list.append(
+                        self.__bots[bot_id].statistics.print_build()
+                    )
                 else:
                     response_list.append(
                         BasicError("Server `{0}` has no bot.".format(server_id)).get()
@@ -236,6 +239,31 @@ class Superuser:
 
         return Response(ResponseStatus.SUCCESS, string)
 
+    def su_buildstats(self, param):  # pylint: disable=unused-argument
+        # Aggregated per addon format, stages in build order
+        global_build_stats = {}
+        for bot in self.__bots.values():
+            if len(bot.statistics.build) == 0:
+                continue
+            addon = type(bot).__name__
+            if addon in global_build_stats:
+                global_build_stats[addon] += bot.statistics.build
+            else:
+                global_build_stats[addon] = Statistics.Data() + bot.statistics.build
+
+        string = "```asciidoc\n=== Global Build Statistics ===```"
+        if len(global_build_stats) > 0:
+            for addon, build_stats in sorted(global_build_stats.items()):
+                string += "```c\n"
+                string += Statistics.format({addon: build_stats.get()}, -2)
+                string += "```"
+        else:
+            string += "```asciidoc\n"
+            string += "[ none ]"
+            string += "```"
+
+        return Response(ResponseStatus.SUCCESS, string)
+
     def su_rhlist(self, param):  # pylint: disable=unused-argument
         raid_user_list = RaidHelper().get_event_signups(int(param.split(" ")[0]))
         signed = []
@@ -259,13 +287,49 @@ class Superuser:
                 return Response(
                     ResponseStatus.SUCCESS,
                     BasicInfo(
-                        "Current logging level: **{0}**\n`STDOUT` **{1}**\n`TRACE` **{2}**".format(
+                        "Current logging level: **{0}**\n`STDOUT` **{1}**\n`TRACE` **{2}** guilds: {3} sampling: {4}".format(
                             BotLogger().get_level_name(),
                             "Enabled" if BotLogger().stdout_enabled else "Disabled",
                             "Enabled" if BotLogger().trace_enabled else "Disabled",
+                            "all"
+                            if BotLogger().trace_guilds is None
+                            else ",".join(map(str, sorted(BotLogger().trace_guilds))),
+                            BotLogger().trace_sampling,
                         )
                     ).get(),
                 )
+        elif len(params) == 2 and params[0].lower() == "trace-guilds":
+            # Comma separated guild ids or all
+            request = params[1].lower()
+            try:
+                BotLogger().config_trace_guilds(
+                    None if request == "all" else request.split(",")
+                )
+            except ValueError:
+                return Response(
+                    ResponseStatus.SUCCESS,
+                    BasicError("Unknown request. Try guild ids or all.").get(),
+                )
+            return Response(
+                ResponseStatus.SUCCESS,
+                BasicSuccess("`TRACE` guilds: {0}".format(request)).get(),
+            )
+        elif len(params) == 2 and params[0].lower() == "trace-sampling":
+            try:
+                valid = BotLogger().config_trace_sampling(params[1])
+            except ValueError:
+                valid = False
+            if not valid:
+                return Response(
+                    ResponseStatus.SUCCESS,
+                    BasicError("Unknown request. Try a rate in (0, 1].").get(),
+                )
+            return Response(
+                ResponseStatus.SUCCESS,
+                BasicSuccess(
+                    "`TRACE` sampling: {0}".format(BotLogger().trace_sampling)
+                ).get(),
+            )
         elif len(params) == 2:
             config = params[0].lower()
             request = params[1].lower()